@@ -0,0 +1,151 @@
+"""Asyncio front end for Ruleset
+
+Every JVM call of an AsyncRuleset runs in an executor thread so the event
+loop, which also runs handle_async_messages, is never blocked by rule
+evaluation. Calls are submitted to a single-threaded executor and
+complete in submission order, and rule callbacks are dispatched on the
+event loop once their JVM call has returned.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from . import tracing
+from .rule import Rule
+from .ruleset import Ruleset, _to_json
+
+logger = logging.getLogger(__name__)
+
+_default_executor: Optional[ThreadPoolExecutor] = None
+
+# Span names match the synchronous Ruleset methods
+_OPERATIONS = {
+    "assertEvent": "assert_event",
+    "assertFact": "assert_fact",
+    "retractFact": "retract_fact",
+    "retractMatchingFacts": "retract_matching_facts",
+}
+
+
+def default_executor() -> ThreadPoolExecutor:
+    """The shared thread used for JVM calls, jpy attaches it on first use"""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="drools-jvm"
+        )
+    return _default_executor
+
+
+class AsyncRuleset:
+    """Run the JVM calls of a Ruleset off the event loop
+
+    The executor must run one task at a time for calls to stay ordered,
+    by default all AsyncRulesets share default_executor().
+    """
+
+    def __init__(self, ruleset: Ruleset, executor: Optional[Executor] = None):
+        self.ruleset = ruleset
+        self.executor = executor or default_executor()
+
+    @classmethod
+    async def create(
+        cls,
+        name: str,
+        serialized_ruleset: str,
+        executor: Optional[Executor] = None,
+    ) -> "AsyncRuleset":
+        executor = executor or default_executor()
+        loop = asyncio.get_running_loop()
+        ruleset = await loop.run_in_executor(
+            executor, lambda: Ruleset(name, serialized_ruleset)
+        )
+        return cls(ruleset, executor)
+
+    @property
+    def name(self) -> str:
+        return self.ruleset.name
+
+    def add_rule(self, rule: Rule) -> None:
+        self.ruleset.add_rule(rule)
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, tracing.bind_context(func), *args
+        )
+
+    async def _call_and_dispatch(self, method: str, *args):
+        api = self.ruleset._api
+        with tracing.operation_span(self.ruleset, _OPERATIONS[method]):
+            payload = await self._call(
+                getattr(api, method), self.ruleset._session_id, *args
+            )
+            self.ruleset._process_response(payload)
+
+    async def assert_event(self, serialized_event: str):
+        await self._call_and_dispatch(
+            "assertEvent", _to_json(serialized_event)
+        )
+
+    async def assert_events(self, serialized_events: List[str]):
+        """Assert a batch of events in one executor call
+
+        The engine has processed every event by the time matches are
+        dispatched, so the matches of all events are dispatched even if
+        one of them fails. The first error is raised afterwards.
+        """
+        with tracing.operation_span(self.ruleset, "assert_events"):
+            payloads = await self._call(
+                self._assert_events,
+                [
+                    _to_json(serialized_event)
+                    for serialized_event in serialized_events
+                ],
+            )
+            error = None
+            for payload in payloads:
+                try:
+                    self.ruleset._process_response(payload)
+                except Exception as e:
+                    error = error or e
+            if error is not None:
+                raise error
+
+    def _assert_events(self, serialized_events: List[str]) -> List[str]:
+        assert_event = self.ruleset._api.assertEvent
+        session_id = self.ruleset._session_id
+        return [
+            assert_event(session_id, serialized_event)
+            for serialized_event in serialized_events
+        ]
+
+    async def assert_fact(self, serialized_fact: str):
+        await self._call_and_dispatch("assertFact", _to_json(serialized_fact))
+
+    async def retract_fact(self, serialized_fact: str):
+        await self._call_and_dispatch("retractFact", _to_json(serialized_fact))
+
+    async def retract_matching_facts(
+        self, serialized_fact: str, partial: bool, exclude_keys: List[str]
+    ):
+        await self._call_and_dispatch(
+            "retractMatchingFacts",
+            _to_json(serialized_fact),
+            partial,
+            exclude_keys,
+        )
+
+    async def get_facts(self):
+        return await self._call(self.ruleset.get_facts)
+
+    async def session_stats(self) -> Dict:
+        return await self._call(self.ruleset.session_stats)
+
+    async def advance_time(self, amount: int, units: str):
+        return await self._call(self.ruleset.advance_time, amount, units)
+
+    async def end_session(self) -> Dict:
+        return await self._call(self.ruleset.end_session)
@@ -0,0 +1,791 @@
+"""Benchmark rulesets through the engine
+
+Loads ruleset ASTs (the same format as tests/asts), generates events that
+satisfy the simple conditions of each rule and reports throughput,
+assert latency, match dispatch time, JVM heap and Python RSS as JSON:
+
+    python -m drools.bench tests/asts/*.yml --iterations 1000 -o run.json
+
+Results are meant to be compared across versions of the package or the
+jar, and across settings such as DROOLS_JPY_JSON_CODEC,
+DROOLS_JPY_JVM_PRESET or DROOLS_JPY_JVM_CDS_ARCHIVE, which all apply
+to the benchmark process. --generate adds a ruleset of equality and in
+constraints on one attribute, to compare DROOLS_JPY_ALPHA_HASHING_THRESHOLD
+settings on large rulebooks:
+
+    python -m drools.bench --generate 1000
+
+--scenario runs a benchmark of one feature, against its plain
+alternative where there is one:
+
+    bulk_retract    retract_facts and retract_matching_facts_bulk
+                    against a call per fact
+    first_match     time to first match of a new process, with and
+                    without a CDS archive
+    loop_latency    event loop lag with Ruleset and AsyncRuleset
+    scaling         1 to 16 rulesets on SessionScheduler workers
+    session_lookup  session id lookup with 1, 100 and 1000 rulesets
+    sharding        rulesets in this process against a ShardedEngine
+    upsert          upsert_fact against retract_fact and assert_fact
+
+    python -m drools.bench --scenario upsert --scenario sharding
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .async_ruleset import AsyncRuleset
+from .cds import create_cds_archive
+from .exceptions import RuleNotFoundError
+from .rule import Rule
+from .ruleset import (
+    Ruleset,
+    RulesetCollection,
+    _get_jar,
+    get_json_codec,
+    set_json_codec,
+)
+from .scheduler import SessionScheduler
+from .sharding import ShardedEngine
+
+logger = logging.getLogger(__name__)
+
+_SIMPLE_PATH = re.compile(r"^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$")
+
+_LITERALS = ("Integer", "Float", "String", "Boolean", "NullType")
+
+
+def load_rulesets(path: str) -> List[Dict]:
+    """Read the RuleSet ASTs from a .json or .yml file"""
+    with open(path) as f:
+        if path.endswith((".yml", ".yaml")):
+            import yaml
+
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [item.get("RuleSet", item) for item in data]
+
+
+def _literal(node: Any):
+    if isinstance(node, dict):
+        for kind in _LITERALS:
+            if kind in node:
+                return True, node[kind]
+    return False, None
+
+
+def _set_path(event: Dict, path: str, value: Any) -> None:
+    keys = path.split(".")
+    for key in keys[:-1]:
+        event = event.setdefault(key, {})
+        if not isinstance(event, dict):
+            return
+    event[keys[-1]] = value
+
+
+def _satisfy(expression: Dict, event: Dict) -> None:
+    # Best effort: conditions that can't be derived are left unsatisfied
+    for kind, body in expression.items():
+        if kind in ("AndExpression", "OrExpression"):
+            _satisfy(body["lhs"], event)
+            if kind == "AndExpression":
+                _satisfy(body["rhs"], event)
+            continue
+        if kind == "AssignmentExpression":
+            _satisfy(body["rhs"], event)
+            continue
+        if not isinstance(body, dict) or "lhs" not in body:
+            continue
+        path = (
+            body["lhs"].get("Event") if isinstance(body["lhs"], dict) else None
+        )
+        if not path or not _SIMPLE_PATH.match(path):
+            continue
+
+        if kind == "IsDefinedExpression":
+            _set_path(event, path, 1)
+            continue
+        rhs = body.get("rhs")
+        if kind == "ItemInListExpression":
+            found, value = _literal(rhs[0] if isinstance(rhs, list) else None)
+        elif kind == "ListContainsItemExpression":
+            found, value = _literal(rhs)
+            value = [value]
+        else:
+            found, value = _literal(rhs)
+        if not found:
+            continue
+
+        if kind == "GreaterThanExpression" and isinstance(value, (int, float)):
+            value = value + 1
+        elif kind == "LessThanExpression" and isinstance(value, (int, float)):
+            value = value - 1
+        elif kind not in (
+            "EqualsExpression",
+            "GreaterThanOrEqualToExpression",
+            "LessThanOrEqualToExpression",
+            "ItemInListExpression",
+            "ListContainsItemExpression",
+        ):
+            continue
+        _set_path(event, path, value)
+
+
+def synthetic_events(ruleset_data: Dict) -> List[Dict]:
+    """One event per rule condition, built to satisfy it where possible"""
+    events = []
+    for rule in ruleset_data.get("rules", []):
+        condition = rule["Rule"].get("condition", {})
+        for conditions in condition.values():
+            if not isinstance(conditions, list):
+                continue
+            for expression in conditions:
+                if not isinstance(expression, dict):
+                    continue
+                event = {}
+                _satisfy(expression, event)
+                if event:
+                    events.append(event)
+    return events or [{}]
+
+
+def generate_equality_ruleset(
+    rules: int = 1000, attribute: str = "host", in_every: int = 10
+) -> Dict:
+    """A ruleset of rules testing one attribute against a constant
+
+    Every in_every-th rule tests membership in a list of two constants
+    instead, in the format of the ASTs in tests/asts.
+    """
+    ruleset_rules = []
+    for index in range(rules):
+        value = {"String": f"{attribute}-{index}"}
+        if in_every and index % in_every == in_every - 1:
+            expression = {
+                "ItemInListExpression": {
+                    "lhs": {"Event": attribute},
+                    "rhs": [value, {"String": f"{attribute}-{index}-alt"}],
+                }
+            }
+        else:
+            expression = {
+                "EqualsExpression": {
+                    "lhs": {"Event": attribute},
+                    "rhs": value,
+                }
+            }
+        ruleset_rules.append(
+            {
+                "Rule": {
+                    "name": f"r_{index}",
+                    "condition": {"AllCondition": [expression]},
+                    "actions": [
+                        {"Action": {"action": "debug", "action_args": {}}}
+                    ],
+                    "enabled": True,
+                }
+            }
+        )
+    return {
+        "name": f"generated {rules} {attribute} rules",
+        "hosts": ["all"],
+        "rules": ruleset_rules,
+        "sources": [],
+    }
+
+
+def rule_names(ruleset_data: Dict) -> List[str]:
+    return [
+        rule["Rule"].get("name") or f"r_{index}"
+        for index, rule in enumerate(ruleset_data.get("rules", []))
+    ]
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * len(ordered))))
+    return ordered[index]
+
+
+def jvm_heap() -> Dict:
+    import jpy
+
+    management_factory = jpy.get_type("java.lang.management.ManagementFactory")
+    usage = management_factory.getMemoryMXBean().getHeapMemoryUsage()
+    return {
+        "used": usage.getUsed(),
+        "committed": usage.getCommitted(),
+        "max": usage.getMax(),
+    }
+
+
+def python_rss() -> Optional[int]:
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def benchmark_ruleset(
+    ruleset_data: Dict,
+    iterations: int = 1000,
+    events: Optional[List[Dict]] = None,
+) -> Dict:
+    """Assert the events iterations times in rotation and measure it"""
+    if events is None:
+        events = synthetic_events(ruleset_data)
+    codec = get_json_codec()
+    serialized_events = [codec.dumps(event) for event in events]
+    counts = {"matches": 0, "unknown_rules": 0}
+
+    def count(matches):
+        counts["matches"] += 1
+
+    start = time.perf_counter()
+    rs = Ruleset(
+        name=f"bench {ruleset_data.get('name')}",
+        serialized_ruleset=codec.dumps(ruleset_data),
+    )
+    compile_time = time.perf_counter() - start
+    for name in rule_names(ruleset_data):
+        rs.add_rule(Rule(name, count))
+
+    assert_event = rs._api.assertEvent
+    latencies = []
+    dispatch_time = 0.0
+    try:
+        start = time.perf_counter()
+        for index in range(iterations):
+            serialized_event = serialized_events[index % len(events)]
+            sent = time.perf_counter()
+            payload = assert_event(rs._session_id, serialized_event)
+            returned = time.perf_counter()
+            try:
+                rs._process_response(payload)
+            except RuleNotFoundError:
+                counts["unknown_rules"] += 1
+            done = time.perf_counter()
+            latencies.append(done - sent)
+            dispatch_time += done - returned
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            rs.assert_events(
+                [
+                    serialized_events[index % len(events)]
+                    for index in range(iterations)
+                ]
+            )
+        except RuleNotFoundError:
+            counts["unknown_rules"] += 1
+        batch_elapsed = time.perf_counter() - start
+    finally:
+        rs.end_session()
+
+    return {
+        "name": ruleset_data.get("name"),
+        "events": len(events),
+        "iterations": iterations,
+        "compile_time": compile_time,
+        "events_per_sec": iterations / elapsed if elapsed else None,
+        "batch_events_per_sec": (
+            iterations / batch_elapsed if batch_elapsed else None
+        ),
+        "p50_latency": _percentile(latencies, 50),
+        "p99_latency": _percentile(latencies, 99),
+        "max_latency": max(latencies, default=0.0),
+        "dispatch_time": dispatch_time,
+        "matches": counts["matches"],
+        "unknown_rules": counts["unknown_rules"],
+    }
+
+
+def _session(ruleset_data: Dict, name: str, callback=None) -> Ruleset:
+    rs = Ruleset(
+        name=name, serialized_ruleset=get_json_codec().dumps(ruleset_data)
+    )
+    for rule_name in rule_names(ruleset_data):
+        rs.add_rule(Rule(rule_name, callback or (lambda matches: None)))
+    return rs
+
+
+def _rate(count: int, elapsed: float) -> Optional[float]:
+    return count / elapsed if elapsed else None
+
+
+def host_state_ruleset() -> Dict:
+    """A rule matching a windows host fact together with an event"""
+    return {
+        "name": "host state",
+        "hosts": ["all"],
+        "rules": [
+            {
+                "Rule": {
+                    "name": "windows host",
+                    "condition": {
+                        "AllCondition": [
+                            {
+                                "EqualsExpression": {
+                                    "lhs": {"Fact": "os"},
+                                    "rhs": {"String": "windows"},
+                                }
+                            },
+                            {
+                                "EqualsExpression": {
+                                    "lhs": {"Event": "i"},
+                                    "rhs": {"Integer": 1},
+                                }
+                            },
+                        ]
+                    },
+                    "actions": [
+                        {"Action": {"action": "debug", "action_args": {}}}
+                    ],
+                    "enabled": True,
+                }
+            }
+        ],
+        "sources": [],
+    }
+
+
+def benchmark_upsert(iterations: int = 1000, hosts: int = 100) -> Dict:
+    """Rolling host state updates, retract and assert against upsert"""
+    codec = get_json_codec()
+    states = [
+        [
+            codec.dumps({"host": f"host-{host}", "os": os_name})
+            for os_name in ("linux", "windows")
+        ]
+        for host in range(hosts)
+    ]
+    result = {"hosts": hosts, "iterations": iterations}
+    for mode in ("retract_assert", "upsert"):
+        rs = _session(host_state_ruleset(), f"bench upsert {mode}")
+        try:
+            for host in range(hosts):
+                rs.upsert_fact(["host"], states[host][0])
+            start = time.perf_counter()
+            for index in range(iterations):
+                host = index % hosts
+                turn = index // hosts
+                new = states[host][(turn + 1) % 2]
+                if mode == "upsert":
+                    rs.upsert_fact(["host"], new)
+                else:
+                    rs.retract_fact(states[host][turn % 2])
+                    rs.assert_fact(new)
+            elapsed = time.perf_counter() - start
+        finally:
+            rs.end_session()
+        result[f"{mode}_per_sec"] = _rate(iterations, elapsed)
+    return result
+
+
+def _host_events(count: int, hosts: int = 100) -> List[str]:
+    codec = get_json_codec()
+    return [
+        codec.dumps({"host": f"host-{index % hosts}"})
+        for index in range(count)
+    ]
+
+
+def benchmark_session_lookup(
+    iterations: int = 1000, sizes: Tuple[int, ...] = (1, 100, 1000)
+) -> Dict:
+    """Time of a session id lookup with 1, 100 and 1000 rulesets loaded"""
+    ruleset_data = generate_equality_ruleset(1)
+    result = {}
+    for size in sizes:
+        rulesets = [
+            _session(ruleset_data, f"bench lookup {size} {index}")
+            for index in range(size)
+        ]
+        try:
+            session_ids = [rs._session_id for rs in rulesets]
+            start = time.perf_counter()
+            for index in range(iterations):
+                RulesetCollection.get_by_session_id(session_ids[index % size])
+            elapsed = time.perf_counter() - start
+        finally:
+            for rs in rulesets:
+                rs.end_session()
+        result[str(size)] = {"lookup_time": elapsed / iterations}
+    return result
+
+
+def first_match_time() -> float:
+    """Seconds from starting the engine to the first rule callback
+
+    Only meaningful in a process that has not started the engine yet.
+    """
+    matched = []
+    start = time.perf_counter()
+    rs = _session(
+        generate_equality_ruleset(1),
+        "bench first match",
+        lambda matches: matched.append(time.perf_counter()),
+    )
+    rs.assert_event(_host_events(1)[0])
+    rs.end_session()
+    return matched[0] - start
+
+
+def _first_match_in_subprocess(env: Dict[str, str]) -> float:
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from drools.bench import first_match_time; "
+            "print(first_match_time())",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"First match run failed with exit code {completed.returncode}: "
+            f"{completed.stderr}"
+        )
+    return float(completed.stdout.split()[-1])
+
+
+def benchmark_first_match(iterations: int = 1000, runs: int = 3) -> Dict:
+    """Time to first match of a fresh process, without and with CDS
+
+    Each run starts a JVM, so iterations is not used. The CDS archive is
+    created for the run from the same ruleset and event.
+    """
+    env = dict(os.environ)
+    env.pop("DROOLS_JPY_JVM_CDS_ARCHIVE", None)
+    result = {
+        "without_cds": min(
+            _first_match_in_subprocess(env) for _ in range(runs)
+        )
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        env["DROOLS_JPY_JVM_CDS_ARCHIVE"] = create_cds_archive(
+            os.path.join(directory, "bench.jsa"),
+            [get_json_codec().dumps(generate_equality_ruleset(1))],
+            _host_events(1),
+        )
+        result["with_cds"] = min(
+            _first_match_in_subprocess(env) for _ in range(runs)
+        )
+    return result
+
+
+async def _loop_lags(
+    rs: Ruleset, events: List[str], mode: str, interval: float
+) -> List[float]:
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Event()
+    lags = []
+
+    async def tick():
+        while not finished.is_set():
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lags.append(loop.time() - start - interval)
+
+    async def produce():
+        try:
+            if mode == "async":
+                async_rs = AsyncRuleset(rs)
+                for event in events:
+                    await async_rs.assert_event(event)
+            else:
+                for event in events:
+                    rs.assert_event(event)
+                    await asyncio.sleep(0)
+        finally:
+            finished.set()
+
+    await asyncio.gather(tick(), produce())
+    return lags
+
+
+def benchmark_loop_latency(
+    iterations: int = 1000, interval: float = 0.001
+) -> Dict:
+    """Event loop lag while asserting, Ruleset against AsyncRuleset"""
+    ruleset_data = generate_equality_ruleset(100)
+    events = _host_events(iterations)
+    result = {}
+    for mode in ("sync", "async"):
+        rs = _session(ruleset_data, f"bench loop latency {mode}")
+        try:
+            lags = asyncio.run(_loop_lags(rs, events, mode, interval))
+        finally:
+            rs.end_session()
+        result[mode] = {
+            "p50_lag": _percentile(lags, 50),
+            "p99_lag": _percentile(lags, 99),
+            "max_lag": max(lags, default=0.0),
+        }
+    return result
+
+
+def benchmark_scaling(
+    iterations: int = 1000, sizes: Tuple[int, ...] = (1, 2, 4, 8, 16)
+) -> Dict:
+    """Throughput of 1 to 16 rulesets on as many SessionScheduler workers"""
+    ruleset_data = generate_equality_ruleset(100)
+    events = _host_events(iterations)
+    result = {}
+    for size in sizes:
+        names = [f"bench scaling {size} {index}" for index in range(size)]
+        rulesets = [_session(ruleset_data, name) for name in names]
+        scheduler = SessionScheduler(workers=size)
+        try:
+            start = time.perf_counter()
+            futures = [scheduler.assert_events(name, events) for name in names]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - start
+        finally:
+            scheduler.shutdown()
+            for rs in rulesets:
+                rs.end_session()
+        result[str(size)] = {
+            "events_per_sec": _rate(size * iterations, elapsed)
+        }
+    return result
+
+
+def benchmark_sharding(
+    iterations: int = 1000, rulesets: int = 4, shards: int = 2
+) -> Dict:
+    """Throughput of the same rulesets in this process and sharded"""
+    ruleset_data = generate_equality_ruleset(100)
+    events = _host_events(iterations)
+    names = [f"bench sharding {index}" for index in range(rulesets)]
+
+    local = [_session(ruleset_data, f"{name} single") for name in names]
+    try:
+        start = time.perf_counter()
+        for rs in local:
+            rs.assert_events(events)
+        single_elapsed = time.perf_counter() - start
+    finally:
+        for rs in local:
+            rs.end_session()
+
+    engine = ShardedEngine(shards=shards)
+    try:
+        serialized_ruleset = get_json_codec().dumps(ruleset_data)
+        for name in names:
+            rs = engine.create_ruleset(name, serialized_ruleset)
+            for rule_name in rule_names(ruleset_data):
+                rs.add_rule(Rule(rule_name, lambda matches: None))
+        start = time.perf_counter()
+        futures = [
+            engine.assert_event(name, event)
+            for event in events
+            for name in names
+        ]
+        for future in futures:
+            future.result()
+        sharded_elapsed = time.perf_counter() - start
+    finally:
+        engine.shutdown()
+
+    return {
+        "rulesets": rulesets,
+        "shards": shards,
+        "single_events_per_sec": _rate(rulesets * iterations, single_elapsed),
+        "sharded_events_per_sec": _rate(
+            rulesets * iterations, sharded_elapsed
+        ),
+    }
+
+
+def benchmark_bulk_retract(iterations: int = 1000) -> Dict:
+    """Retracting iterations facts in bulk against one call per fact"""
+    codec = get_json_codec()
+    facts = [
+        codec.dumps({"host": f"host-{index}", "os": "linux"})
+        for index in range(iterations)
+    ]
+    patterns = [
+        codec.dumps({"host": f"host-{index}"}) for index in range(iterations)
+    ]
+    result = {"facts": iterations}
+    for mode in (
+        "retract_fact",
+        "retract_facts",
+        "retract_matching_facts",
+        "retract_matching_facts_bulk",
+    ):
+        rs = _session(host_state_ruleset(), f"bench {mode}")
+        try:
+            for fact in facts:
+                rs.assert_fact(fact)
+            start = time.perf_counter()
+            if mode == "retract_fact":
+                for fact in facts:
+                    rs.retract_fact(fact)
+            elif mode == "retract_facts":
+                rs.retract_facts(facts)
+            elif mode == "retract_matching_facts":
+                for pattern in patterns:
+                    rs.retract_matching_facts(pattern, True, [])
+            else:
+                rs.retract_matching_facts_bulk(patterns, True, [])
+            elapsed = time.perf_counter() - start
+        finally:
+            rs.end_session()
+        result[f"{mode}_per_sec"] = _rate(iterations, elapsed)
+    return result
+
+
+# Benchmarks of single features, selected with --scenario
+SCENARIOS: Dict[str, Callable[[int], Dict]] = {
+    "bulk_retract": benchmark_bulk_retract,
+    "first_match": benchmark_first_match,
+    "loop_latency": benchmark_loop_latency,
+    "scaling": benchmark_scaling,
+    "session_lookup": benchmark_session_lookup,
+    "sharding": benchmark_sharding,
+    "upsert": benchmark_upsert,
+}
+
+
+def _benchmark(ruleset_data: Dict, iterations: int) -> Dict:
+    logger.info("Benchmarking %s", ruleset_data.get("name"))
+    try:
+        return benchmark_ruleset(ruleset_data, iterations)
+    except Exception as e:
+        return {"name": ruleset_data.get("name"), "error": str(e)}
+
+
+def _run_scenario(name: str, iterations: int) -> Dict:
+    logger.info("Running scenario %s", name)
+    try:
+        return SCENARIOS[name](iterations)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run(
+    paths: List[str],
+    iterations: int = 1000,
+    generate: int = 0,
+    scenarios: Optional[List[str]] = None,
+) -> Dict:
+    start = time.perf_counter()
+    RulesetCollection.create_engine()
+    engine_start_time = time.perf_counter() - start
+
+    results = []
+    for path in paths:
+        for ruleset_data in load_rulesets(path):
+            result = _benchmark(ruleset_data, iterations)
+            result["file"] = os.path.basename(path)
+            results.append(result)
+    if generate:
+        result = _benchmark(generate_equality_ruleset(generate), iterations)
+        result["file"] = None
+        results.append(result)
+    scenario_results = {
+        name: _run_scenario(name, iterations) for name in scenarios or ()
+    }
+
+    try:
+        from importlib.metadata import version
+
+        package_version = version("drools_jpy")
+    except Exception:
+        package_version = None
+
+    return {
+        "package_version": package_version,
+        "jar": os.path.basename(
+            os.environ.get("DROOLS_JPY_CLASSPATH") or _get_jar()
+        ),
+        "python": platform.python_version(),
+        "codec": get_json_codec().name,
+        "alpha_hashing_threshold": os.environ.get(
+            "DROOLS_JPY_ALPHA_HASHING_THRESHOLD"
+        ),
+        "engine_start_time": engine_start_time,
+        "jvm_heap": jvm_heap(),
+        "python_rss": python_rss(),
+        "results": results,
+        "scenarios": scenario_results,
+    }
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m drools.bench", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("paths", nargs="*", help="ruleset AST files")
+    parser.add_argument("-n", "--iterations", type=int, default=1000)
+    parser.add_argument(
+        "--generate",
+        type=int,
+        default=0,
+        metavar="RULES",
+        help="also run a generated ruleset of RULES equality rules",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS) + ["all"],
+        help="also run a feature benchmark, can be repeated",
+    )
+    parser.add_argument("--codec", help="JSON codec, see set_json_codec")
+    parser.add_argument("-o", "--output", help="write JSON here")
+    options = parser.parse_args(args)
+    scenarios = options.scenario or []
+    if "all" in scenarios:
+        scenarios = list(SCENARIOS)
+    if not options.paths and not options.generate and not scenarios:
+        parser.error("expected ruleset AST files, --generate or --scenario")
+
+    if options.codec:
+        set_json_codec(options.codec)
+    report = run(
+        options.paths, options.iterations, options.generate, scenarios
+    )
+    RulesetCollection.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
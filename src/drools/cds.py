@@ -0,0 +1,100 @@
+"""Class Data Sharing archive support
+
+Booting the JVM and compiling the first ruleset loads thousands of Drools
+classes. A dynamic AppCDS archive, recorded while running representative
+rulesets, lets later JVMs map those classes instead of loading them:
+
+    from drools.cds import create_cds_archive
+
+    create_cds_archive("/var/cache/drools.jsa", [serialized_ruleset])
+
+and then start workers with DROOLS_JPY_JVM_CDS_ARCHIVE=/var/cache/drools.jsa.
+The archive is only valid for the JDK and jar it was created with, the JVM
+ignores it with a warning otherwise.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Iterable
+
+from .exceptions import RuleNotFoundError
+from .ruleset import Ruleset, RulesetCollection
+
+logger = logging.getLogger(__name__)
+
+
+def create_cds_archive(
+    archive_path: str,
+    serialized_rulesets: Iterable[str],
+    serialized_events: Iterable[str] = (),
+    timeout: float = 300,
+) -> str:
+    """Create a CDS archive from a training run in a separate process
+
+    Each ruleset is compiled and receives every event, the classes loaded
+    on the way are written to archive_path when the training JVM exits.
+    """
+    archive_path = os.path.abspath(archive_path)
+    training = {
+        "rulesets": list(serialized_rulesets),
+        "events": list(serialized_events),
+    }
+    env = dict(os.environ, DROOLS_JPY_JVM_CDS_DUMP=archive_path)
+    env.pop("DROOLS_JPY_JVM_CDS_ARCHIVE", None)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+        json.dump(training, f)
+        f.flush()
+        completed = subprocess.run(
+            [sys.executable, "-m", "drools.cds", f.name],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+
+    if completed.returncode != 0 or not os.path.exists(archive_path):
+        raise RuntimeError(
+            "CDS training run failed with exit code "
+            f"{completed.returncode}: {completed.stderr}"
+        )
+    logger.info("Created CDS archive: %s", archive_path)
+    return archive_path
+
+
+def train(
+    serialized_rulesets: Iterable[str], serialized_events: Iterable[str]
+):
+    events = list(serialized_events)
+    for index, serialized_ruleset in enumerate(serialized_rulesets):
+        rs = Ruleset(
+            name=f"cds_training_{index}",
+            serialized_ruleset=serialized_ruleset,
+        )
+        for event in events:
+            try:
+                rs.assert_event(event)
+            except RuleNotFoundError:
+                # No callbacks are registered, matches are expected
+                pass
+        rs.end_session()
+
+
+def main(training_file: str) -> None:
+    with open(training_file) as f:
+        training = json.load(f)
+    train(training["rulesets"], training["events"])
+    RulesetCollection.shutdown()
+
+    import jpy
+
+    # The archive is written by the JVM exit sequence
+    jpy.get_type("java.lang.System").exit(0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -1,12 +1,17 @@
 import asyncio
-import json
 import logging
 from dataclasses import dataclass
+from typing import List
 
-from .ruleset import RulesetCollection
+from . import tracing
+from .exceptions import RulesetNotFoundError
+from .ruleset import RulesetCollection, _json_loads
 
 logger = logging.getLogger(__name__)
 
+FRAME_HEADER_SIZE = 4
+READ_CHUNK_SIZE = 64 * 1024
+
 
 @dataclass(frozen=True)
 class Dispatch:
@@ -16,7 +21,71 @@ class Dispatch:
     def run(self) -> None:
         logger.debug("Dispatching for session " + str(self.session_id))
         rs = RulesetCollection.get_by_session_id(self.session_id)
-        rs.dispatch(self.serialized_result)
+        with tracing.async_dispatch_span(rs):
+            rs.dispatch(self.serialized_result)
+
+
+class FrameReader:
+    """Split the async channel stream into length prefixed payloads
+
+    Every frame is a 4 byte big endian length followed by that many bytes.
+    Socket reads are buffered so several small frames arriving together
+    are returned from a single read, while the remainder of a large frame
+    is read with readexactly so it is never split.
+    """
+
+    def __init__(self, reader, chunk_size: int = READ_CHUNK_SIZE):
+        self._reader = reader
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def _missing_bytes(self) -> int:
+        if len(self._buffer) < FRAME_HEADER_SIZE:
+            return 0
+        length = int.from_bytes(self._buffer[:FRAME_HEADER_SIZE], "big")
+        return FRAME_HEADER_SIZE + length - len(self._buffer)
+
+    def _pop_frames(self) -> List[bytes]:
+        frames = []
+        offset = 0
+        size = len(self._buffer)
+        # Copy each payload once, straight out of the buffer
+        with memoryview(self._buffer) as view:
+            while size - offset >= FRAME_HEADER_SIZE:
+                start = offset + FRAME_HEADER_SIZE
+                end = start + int.from_bytes(view[offset:start], "big")
+                if end > size:
+                    break
+                frames.append(view[start:end].tobytes())
+                offset = end
+        del self._buffer[:offset]
+        return frames
+
+    async def read_frames(self) -> List[bytes]:
+        """Return the next complete frames, or an empty list at EOF"""
+        while True:
+            frames = self._pop_frames()
+            if frames:
+                return frames
+
+            missing = self._missing_bytes()
+            if missing > self._chunk_size:
+                # Join the rest of a large frame with its buffered start
+                # instead of copying it through the buffer
+                rest = await self._reader.readexactly(missing)
+                with memoryview(self._buffer) as view:
+                    payload = b"".join((view[FRAME_HEADER_SIZE:], rest))
+                self._buffer.clear()
+                return [payload]
+
+            chunk = await self._reader.read(self._chunk_size)
+            if not chunk:
+                if self._buffer:
+                    raise asyncio.IncompleteReadError(
+                        bytes(self._buffer), None
+                    )
+                return frames
+            self._buffer.extend(chunk)
 
 
 async def establish_async_channel():
@@ -33,23 +102,32 @@ async def establish_async_channel():
 
 
 async def handle_async_messages(reader, writer):
+    frame_reader = FrameReader(reader)
     try:
         while True:
-            length = await reader.read(4)
-            bytes_to_read = int.from_bytes(length, "big")
-            logger.debug(
-                "Reading " + str(bytes_to_read) + " from async channel"
-            )
-            payload = await reader.read(bytes_to_read)
-            if payload:
-                logger.debug("Async Response " + str(payload))
-                data = json.loads(payload)
+            payloads = await frame_reader.read_frames()
+            if not payloads:
+                logger.debug("Async channel closed by the engine")
+                break
+            for payload in payloads:
+                if not payload:
+                    continue
+                logger.debug("Async Response %s", payload)
+                data = _json_loads(payload)
                 for result in data["result"]:
                     dispatch = Dispatch(
                         session_id=data["session_id"],
                         serialized_result=result,
                     )
-                    dispatch.run()
+                    try:
+                        dispatch.run()
+                    except RulesetNotFoundError as e:
+                        # The session ended while its matches were in flight
+                        logger.warning("Dropping async match: %s", e)
+    except asyncio.IncompleteReadError as e:
+        logger.error(
+            "Async channel closed mid frame after %s bytes", len(e.partial)
+        )
     except asyncio.CancelledError:
         logger.debug("Shutting down async channel")
         RulesetCollection.shutdown()
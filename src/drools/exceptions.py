@@ -20,3 +20,11 @@ class InvalidRuleMissingConditionError(Exception):
 
 class InvalidRuleError(Exception):
     pass
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class ShardFailedError(Exception):
+    pass
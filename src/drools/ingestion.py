@@ -0,0 +1,173 @@
+"""Bounded event ingestion with backpressure
+
+post() asserts events synchronously as fast as callers hand them in. An
+IngestionQueue sits in front of one ruleset, holds at most maxsize
+events and asserts them from its own thread. When the queue is full the
+policy decides what happens to a new event:
+
+    block        wait for space, QueueFullError after the put timeout
+    drop-oldest  discard the oldest queued event
+    reject       raise QueueFullError
+
+Matches delivered on the async channel are already bounded:
+handle_async_messages dispatches each frame before reading the next one,
+so a slow callback stops the socket reads.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from . import ruleset
+from .exceptions import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+QUEUE_POLICIES = ("block", "drop-oldest", "reject")
+
+
+class IngestionQueue:
+    def __init__(
+        self,
+        ruleset_name: str,
+        maxsize: int = 1000,
+        policy: str = "block",
+        handler: Optional[Callable[[str, str], None]] = None,
+    ):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(
+                f"Invalid queue policy {policy}, "
+                f"expected one of {', '.join(QUEUE_POLICIES)}"
+            )
+        if maxsize < 1:
+            raise ValueError("IngestionQueue needs a maxsize of at least 1")
+        self.ruleset_name = ruleset_name
+        self.maxsize = maxsize
+        self.policy = policy
+        self._handler = handler or ruleset.post
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._unfinished = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"drools-ingest-{ruleset_name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def put(self, serialized_event, timeout: Optional[float] = None) -> None:
+        item = (time.monotonic(), ruleset._to_json(serialized_event))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(
+                    f"Ingestion queue for {self.ruleset_name} is closed"
+                )
+            if len(self._items) >= self.maxsize:
+                if self.policy == "reject":
+                    self.rejected += 1
+                    raise QueueFullError(
+                        f"Ingestion queue for {self.ruleset_name} is full"
+                    )
+                if self.policy == "drop-oldest":
+                    self._items.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                elif not self._condition.wait_for(
+                    lambda: len(self._items) < self.maxsize or self._closed,
+                    timeout,
+                ):
+                    self.rejected += 1
+                    raise QueueFullError(
+                        f"Timed out waiting on ingestion queue for "
+                        f"{self.ruleset_name}"
+                    )
+                elif self._closed:
+                    raise RuntimeError(
+                        f"Ingestion queue for {self.ruleset_name} is closed"
+                    )
+            self._items.append(item)
+            self._unfinished += 1
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._items or self._closed)
+                if not self._items:
+                    return
+                enqueued_at, serialized_event = self._items.popleft()
+                self._condition.notify_all()
+
+            try:
+                self._handler(self.ruleset_name, serialized_event)
+            except Exception:
+                logger.exception(
+                    "Failed to assert queued event in %s", self.ruleset_name
+                )
+                failed = True
+            else:
+                failed = False
+            latency = time.monotonic() - enqueued_at
+
+            with self._condition:
+                self._unfinished -= 1
+                self.processed += 1
+                self.failed += failed
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                self._condition.notify_all()
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been asserted"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._unfinished == 0, timeout
+            )
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting events, wait drains the queue first"""
+        with self._condition:
+            self._closed = True
+            if not wait:
+                self._unfinished -= len(self._items)
+                self.dropped += len(self._items)
+                self._items.clear()
+            self._condition.notify_all()
+        self._thread.join()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                "policy": self.policy,
+                "maxsize": self.maxsize,
+                "depth": len(self._items),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "processed": self.processed,
+                "failed": self.failed,
+                "mean_latency": (
+                    self.total_latency / self.processed
+                    if self.processed
+                    else 0.0
+                ),
+                "max_latency": self.max_latency,
+            }
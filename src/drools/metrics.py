@@ -0,0 +1,160 @@
+"""Engine call metrics in the Prometheus text format
+
+    from drools.metrics import PrometheusMetrics
+    from drools.ruleset import set_metrics_sink
+
+    metrics = PrometheusMetrics()
+    set_metrics_sink(metrics)
+    ...
+    print(metrics.export())
+
+Latencies are kept as cumulative histograms per ruleset and engine
+method, payload sizes and matches as counters.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from .ruleset import MetricsSink
+
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count", "request_size", "response_size")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+        self.request_size = 0
+        self.response_size = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in labels.items()
+    )
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class PrometheusMetrics(MetricsSink):
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], _Histogram] = {}
+        self._matches: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def record_call(
+        self,
+        ruleset_name: str,
+        method: str,
+        duration: float,
+        request_size: int,
+        response_size: int,
+    ) -> None:
+        key = (ruleset_name, method)
+        with self._lock:
+            histogram = self._calls.get(key)
+            if histogram is None:
+                histogram = self._calls[key] = _Histogram(len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram.counts[index] += 1
+                    break
+            histogram.sum += duration
+            histogram.count += 1
+            histogram.request_size += request_size
+            histogram.response_size += response_size
+
+    def record_match(self, ruleset_name: str, rule_name: str) -> None:
+        with self._lock:
+            self._matches[(ruleset_name, rule_name)] += 1
+
+    def calls(self) -> Dict[Tuple[str, str], Dict]:
+        """Count and total duration per (ruleset, method)"""
+        with self._lock:
+            return {
+                key: {"count": histogram.count, "sum": histogram.sum}
+                for key, histogram in self._calls.items()
+            }
+
+    def matches(self) -> Dict[Tuple[str, str], int]:
+        """Match count per (ruleset, rule)"""
+        with self._lock:
+            return dict(self._matches)
+
+    def export(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            calls = sorted(self._calls.items())
+            matches = sorted(self._matches.items())
+
+            name = "drools_jpy_call_duration_seconds"
+            lines.append(f"# HELP {name} Duration of engine calls.")
+            lines.append(f"# TYPE {name} histogram")
+            for (ruleset_name, method), histogram in calls:
+                labels = _labels(ruleset=ruleset_name, method=method)
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{{{labels},"
+                        f'le="{_format_bound(bound)}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            for name, attribute, help_text in (
+                (
+                    "drools_jpy_call_request_chars_total",
+                    "request_size",
+                    "Characters sent to the engine.",
+                ),
+                (
+                    "drools_jpy_call_response_chars_total",
+                    "response_size",
+                    "Characters returned by the engine.",
+                ),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (ruleset_name, method), histogram in calls:
+                    labels = _labels(ruleset=ruleset_name, method=method)
+                    value = getattr(histogram, attribute)
+                    lines.append(f"{name}{{{labels}}} {value}")
+
+            name = "drools_jpy_matches_total"
+            lines.append(f"# HELP {name} Rule matches dispatched.")
+            lines.append(f"# TYPE {name} counter")
+            for (ruleset_name, rule_name), count in matches:
+                labels = _labels(ruleset=ruleset_name, rule=rule_name)
+                lines.append(f"{name}{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,390 @@
+"""Rule level profiling of a Ruleset
+
+    rs = Ruleset(name, serialized_ruleset, profiling=True)
+    ...
+    print(rs.profile_report().format())
+
+The engine only reports totals, it has no timings per rule or condition
+node. The profiler therefore combines what can be measured with what the
+ruleset AST tells:
+
+- each condition is classified from the AST, flagging the constructs
+  that are usually expensive (selectattr, select, in and contains,
+  regular expression searches, comparisons with saved events or facts,
+  accumulate_within throttles and not all conditions) into a static cost
+- a condition is counted as evaluated when a payload carries an
+  attribute it reads, which is what the alpha network of the engine
+  tests, and conditions are ranked by cost times evaluations
+- the engine time of every call is measured and reported per top level
+  payload key, rule activations come from the responses and callback
+  times from get_session_stats
+
+Estimated work can't tell conditions of the same shape apart. In a
+rulebook of hundreds of event.host == X rules every condition reads the
+same attribute and gets the same score, whichever rule is the slow one.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .ruleset import SessionStats, _iter_json_array, _json_loads
+
+# Engine calls whose payload is evaluated against the conditions
+PROFILED_METHODS = (
+    "assertEvent",
+    "assertFact",
+    "retractFact",
+    "retractMatchingFacts",
+)
+
+_FEATURES = {
+    "SelectAttrExpression": "selectattr",
+    "SelectAttrNotExpression": "selectattr",
+    "SelectExpression": "select",
+    "SelectNotExpression": "select",
+    "ItemInListExpression": "in",
+    "ItemNotInListExpression": "in",
+    "ListContainsItemExpression": "in",
+    "ListNotContainsItemExpression": "in",
+    "SearchMatchesExpression": "search",
+    "SearchNotMatchesExpression": "search",
+}
+
+# Relative cost of a condition using the feature, on top of a base of 1
+FEATURE_COSTS = {
+    "selectattr": 4,
+    "select": 4,
+    "search": 3,
+    "self-reference": 3,
+    "accumulate_within": 2,
+    "not_all": 2,
+    "in": 2,
+}
+
+# Nodes holding a path into the asserted payload or into saved matches
+_PAYLOAD_NODES = ("Event", "Fact")
+_SAVED_NODES = ("Events", "Facts")
+
+
+# Compared by identity, the profiler keeps them in dicts while counting
+@dataclass(eq=False)
+class ConditionProfile:
+    rule: str
+    index: int
+    expression: str
+    paths: Tuple[str, ...]
+    features: Tuple[str, ...]
+    cost: int = 1
+    evaluations: int = 0
+
+    @property
+    def estimated_work(self) -> int:
+        return self.cost * self.evaluations
+
+
+@dataclass
+class RuleProfile:
+    name: str
+    conditions: int
+    features: Tuple[str, ...]
+    cost: int = 0
+    evaluations: int = 0
+    estimated_work: int = 0
+    activations: int = 0
+    callback_time: float = 0.0
+
+
+@dataclass
+class KeyProfile:
+    """Measured engine time of the calls whose payload had this key"""
+
+    key: str
+    calls: int = 0
+    time: float = 0.0
+    max_time: float = 0.0
+
+
+def _walk(node, paths: List[str], features: List[str]) -> None:
+    if isinstance(node, list):
+        for item in node:
+            _walk(item, paths, features)
+        return
+    if not isinstance(node, dict):
+        return
+    for kind, body in node.items():
+        if kind == "AssignmentExpression" and isinstance(body, dict):
+            # lhs only names the match, e.g. {"Events": "first"}
+            _walk(body.get("rhs"), paths, features)
+        elif kind in _PAYLOAD_NODES and isinstance(body, str):
+            paths.append(body)
+        elif kind in _SAVED_NODES:
+            features.append("self-reference")
+        else:
+            if kind in _FEATURES:
+                features.append(_FEATURES[kind])
+            _walk(body, paths, features)
+
+
+def _expression_kind(expression) -> str:
+    if not isinstance(expression, dict) or not expression:
+        return ""
+    kind, body = next(iter(expression.items()))
+    if kind == "AssignmentExpression" and isinstance(body, dict):
+        return _expression_kind(body.get("rhs"))
+    return kind
+
+
+def analyze(ruleset_data: dict) -> List[ConditionProfile]:
+    """One ConditionProfile per condition of every rule in the AST"""
+    conditions = []
+    for index, rule in enumerate(ruleset_data.get("rules", [])):
+        rule = rule.get("Rule", rule)
+        name = rule.get("name") or f"r_{index}"
+        rule_features = []
+        if (rule.get("throttle") or {}).get("accumulate_within"):
+            rule_features.append("accumulate_within")
+        for condition_type, expressions in (
+            rule.get("condition") or {}
+        ).items():
+            if condition_type == "NotAllCondition":
+                rule_features.append("not_all")
+            if not isinstance(expressions, list):
+                expressions = [expressions]
+            for position, expression in enumerate(expressions):
+                paths: List[str] = []
+                features = list(rule_features)
+                _walk(expression, paths, features)
+                if len(set(paths)) > 1 and "self-reference" not in features:
+                    # Comparing two attributes of the same payload
+                    kind = _expression_kind(expression)
+                    if kind not in ("AndExpression", "OrExpression"):
+                        features.append("self-reference")
+                features = tuple(dict.fromkeys(features))
+                conditions.append(
+                    ConditionProfile(
+                        rule=name,
+                        index=position,
+                        expression=_expression_kind(expression),
+                        paths=tuple(dict.fromkeys(paths)),
+                        features=features,
+                        cost=1
+                        + sum(FEATURE_COSTS.get(item, 0) for item in features),
+                    )
+                )
+    return conditions
+
+
+def _rule_names(response: str) -> List[str]:
+    names = []
+    for result in _iter_json_array(response):
+        if "name" in result and "events" in result:
+            names.append(result["name"])
+        else:
+            names.extend(result)
+    return names
+
+
+class RuleProfiler:
+    def __init__(self, ruleset_data: dict):
+        self.conditions = analyze(ruleset_data)
+        self.rules: Dict[str, RuleProfile] = {}
+        self._by_key: Dict[str, List[ConditionProfile]] = {}
+        self._unkeyed: List[ConditionProfile] = []
+        for condition in self.conditions:
+            rule = self.rules.get(condition.rule)
+            if rule is None:
+                rule = self.rules[condition.rule] = RuleProfile(
+                    condition.rule, 0, ()
+                )
+            rule.conditions += 1
+            rule.cost += condition.cost
+            rule.features = tuple(
+                dict.fromkeys(rule.features + condition.features)
+            )
+            keys = {path.split(".", 1)[0] for path in condition.paths}
+            if not keys:
+                self._unkeyed.append(condition)
+            for key in keys:
+                self._by_key.setdefault(key, []).append(condition)
+        self.keys: Dict[str, KeyProfile] = {}
+        self.calls = 0
+        self.total_time = 0.0
+        self._lock = threading.Lock()
+
+    def _payload_keys(self, payload: str) -> Optional[List[str]]:
+        try:
+            data = _json_loads(payload)
+        except ValueError:
+            return None
+        return list(data) if isinstance(data, dict) else None
+
+    def _touched(self, keys: Optional[List[str]]) -> List[ConditionProfile]:
+        if keys is None:
+            return list(self.conditions)
+        touched = dict.fromkeys(self._unkeyed)
+        for key in keys:
+            for condition in self._by_key.get(key, ()):
+                touched[condition] = None
+        return list(touched)
+
+    def record(
+        self, payload: str, duration: float, response: Optional[str]
+    ) -> None:
+        keys = self._payload_keys(payload)
+        touched = self._touched(keys)
+        activations = _rule_names(response) if response else []
+        with self._lock:
+            self.calls += 1
+            self.total_time += duration
+            for key in keys or ():
+                key_profile = self.keys.get(key)
+                if key_profile is None:
+                    key_profile = self.keys[key] = KeyProfile(key)
+                key_profile.calls += 1
+                key_profile.time += duration
+                if duration > key_profile.max_time:
+                    key_profile.max_time = duration
+            for condition in touched:
+                condition.evaluations += 1
+            for name in activations:
+                rule = self.rules.get(name)
+                if rule is not None:
+                    rule.activations += 1
+
+    def report(self, session: SessionStats) -> "ProfileReport":
+        with self._lock:
+            conditions = [
+                ConditionProfile(**vars(condition))
+                for condition in self.conditions
+            ]
+            rules = {
+                name: RuleProfile(**vars(rule))
+                for name, rule in self.rules.items()
+            }
+            keys = [KeyProfile(**vars(key)) for key in self.keys.values()]
+            calls = self.calls
+            total_time = self.total_time
+        for condition in conditions:
+            rule = rules[condition.rule]
+            rule.evaluations += condition.evaluations
+            rule.estimated_work += condition.estimated_work
+        for name, rule_stats in session.rules.items():
+            if name in rules:
+                rules[name].callback_time = rule_stats.total_time
+        return ProfileReport(
+            calls=calls,
+            total_time=total_time,
+            conditions=sorted(
+                conditions,
+                key=lambda item: (item.estimated_work, item.cost),
+                reverse=True,
+            ),
+            rules=sorted(
+                rules.values(),
+                key=lambda item: (item.estimated_work, item.callback_time),
+                reverse=True,
+            ),
+            keys=sorted(keys, key=lambda item: item.time, reverse=True),
+            session=session,
+        )
+
+
+class ProfilingEngine:
+    """Engine proxy feeding the calls of one session to a RuleProfiler"""
+
+    def __init__(self, engine, profiler: RuleProfiler):
+        self._engine = engine
+        self._profiler = profiler
+
+    def __getattr__(self, method: str):
+        call = getattr(self._engine, method)
+        if method not in PROFILED_METHODS:
+            return call
+        profiler = self._profiler
+
+        def profiled(session_id, payload, *args):
+            start = time.perf_counter()
+            response = call(session_id, payload, *args)
+            profiler.record(payload, time.perf_counter() - start, response)
+            return response
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, method, profiled)
+        return profiled
+
+
+@dataclass
+class ProfileReport:
+    """Conditions and rules ranked by estimated work, keys by engine time
+
+    Estimated work is the static cost of a condition times the number of
+    payloads carrying an attribute it reads, not a measurement, so
+    conditions of the same shape on the same attributes all get the same
+    score. The measured engine time is only available per call, reported
+    per payload key.
+    """
+
+    calls: int
+    total_time: float
+    conditions: List[ConditionProfile] = field(default_factory=list)
+    rules: List[RuleProfile] = field(default_factory=list)
+    keys: List[KeyProfile] = field(default_factory=list)
+    session: Optional[SessionStats] = field(default=None, repr=False)
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "conditions": [
+                dict(vars(condition), estimated_work=condition.estimated_work)
+                for condition in self.conditions
+            ],
+            "rules": [vars(rule) for rule in self.rules],
+            "keys": [vars(key) for key in self.keys],
+        }
+
+    def format(self, limit: int = 20) -> str:
+        lines = [
+            f"{self.calls} engine calls, {self.total_time:.6f}s measured",
+            "",
+            "Conditions by estimated work (static cost x evaluations, "
+            "not measured per node)",
+            "Conditions of the same shape on the same attributes score "
+            "the same and can't be told apart",
+            f"{'work':>10} {'cost':>5} {'evals':>8}  condition",
+        ]
+        for condition in self.conditions[:limit]:
+            features = ", ".join(condition.features)
+            lines.append(
+                f"{condition.estimated_work:>10} {condition.cost:>5} "
+                f"{condition.evaluations:>8}  "
+                f"{condition.rule}[{condition.index}] {condition.expression}"
+                + (f" ({features})" if features else "")
+            )
+        lines.extend(
+            [
+                "",
+                "Rules by estimated work",
+                f"{'work':>10} {'fired':>8} {'callback':>10}  rule",
+            ]
+        )
+        for rule in self.rules[:limit]:
+            lines.append(
+                f"{rule.estimated_work:>10} {rule.activations:>8} "
+                f"{rule.callback_time:>10.6f}  {rule.name}"
+            )
+        lines.extend(
+            [
+                "",
+                "Measured engine time by payload key",
+                f"{'time':>10} {'max':>10} {'calls':>8}  key",
+            ]
+        )
+        for key in self.keys[:limit]:
+            lines.append(
+                f"{key.time:>10.6f} {key.max_time:>10.6f} "
+                f"{key.calls:>8}  {key.key}"
+            )
+        return "\n".join(lines) + "\n"
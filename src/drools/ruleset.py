@@ -1,14 +1,31 @@
 import errno
 import glob
+import itertools
 import json
 import logging
 import os
+import re
+import shlex
+import sys
 import tempfile
-from dataclasses import dataclass, field
-from typing import ClassVar, Dict, List, Optional
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import FrozenInstanceError, dataclass, field, replace
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import jpyutil
 
+from . import tracing
 from .exceptions import RuleNotFoundError, RulesetNotFoundError
 from .rule import Rule
 
@@ -18,6 +35,20 @@ DEFAULT_DROOLS_CLASS = (
 
 DROOLS_JPY_GC_AFTER = int(os.environ.get("DROOLS_JPY_GC_AFTER", 1000))
 
+# count: collect every DROOLS_JPY_GC_AFTER posts
+# heap: every DROOLS_JPY_GC_AFTER posts, collect only when the heap
+#       occupancy is at least DROOLS_JPY_GC_HEAP_THRESHOLD (0.0 - 1.0)
+# time: collect when DROOLS_JPY_GC_INTERVAL seconds have passed
+# off: never collect explicitly
+GC_POLICIES = ("count", "heap", "time", "off")
+DROOLS_JPY_GC_POLICY = os.environ.get("DROOLS_JPY_GC_POLICY", "count")
+DROOLS_JPY_GC_HEAP_THRESHOLD = float(
+    os.environ.get("DROOLS_JPY_GC_HEAP_THRESHOLD", 0.75)
+)
+DROOLS_JPY_GC_INTERVAL = float(os.environ.get("DROOLS_JPY_GC_INTERVAL", 60))
+
+DROOLS_JPY_JSON_CODEC = os.environ.get("DROOLS_JPY_JSON_CODEC", "json")
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +60,152 @@ def _get_jar() -> str:
     return jars[0]
 
 
+# GC and tuning presets, see configure_jvm
+JVM_PRESETS: Dict[str, List[str]] = {
+    "low-latency": ["-XX:+UseZGC"],
+    "low-latency-shenandoah": ["-XX:+UseShenandoahGC"],
+    "balanced": ["-XX:+UseG1GC", "-XX:MaxGCPauseMillis=50"],
+    "high-throughput": ["-XX:+UseParallelGC"],
+}
+
+_MEMORY_SIZE = re.compile(r"^[0-9]+[kKmMgG]?$")
+_GC_OPTION = re.compile(r"^-XX:\+Use[A-Za-z]*GC$")
+
+_jvm_tuning_options: Optional[List[str]] = None
+
+
+def _validate_jvm_options(options: List[str]) -> List[str]:
+    for option in options:
+        if not option.startswith("-"):
+            raise ValueError(f"Invalid JVM option {option}")
+    collectors = [option for option in options if _GC_OPTION.match(option)]
+    if len(set(collectors)) > 1:
+        raise ValueError(
+            "Conflicting garbage collectors: " + ", ".join(collectors)
+        )
+    return options
+
+
+def _memory_option(prefix: str, size: str) -> str:
+    if not _MEMORY_SIZE.match(size):
+        raise ValueError(f"Invalid memory size {size} for {prefix}")
+    return prefix + size
+
+
+def _alpha_hashing_option(threshold) -> str:
+    if isinstance(threshold, bool) or not isinstance(threshold, int):
+        raise ValueError(f"Invalid alpha hashing threshold {threshold}")
+    if threshold < 0:
+        raise ValueError(f"Invalid alpha hashing threshold {threshold}")
+    return f"-Ddrools.alphaNodeHashingThreshold={threshold}"
+
+
+def jvm_tuning_options(
+    preset: Optional[str] = None,
+    initial_heap: Optional[str] = None,
+    max_metaspace: Optional[str] = None,
+    string_deduplication: bool = False,
+    options: Optional[List[str]] = None,
+    alpha_hashing_threshold: Optional[int] = None,
+) -> List[str]:
+    """Build a validated list of JVM tuning options
+
+    preset is one of JVM_PRESETS, heap and metaspace sizes use the JVM
+    format (e.g. 256M) and options are appended verbatim.
+    alpha_hashing_threshold is the number of equality constraints on the
+    same attribute after which Drools hashes them into one alpha node
+    index (Drools defaults to 3).
+    """
+    result = []
+    if preset:
+        if preset not in JVM_PRESETS:
+            raise ValueError(
+                f"Unknown JVM preset {preset}, "
+                f"expected one of {', '.join(JVM_PRESETS)}"
+            )
+        result.extend(JVM_PRESETS[preset])
+    if initial_heap:
+        result.append(_memory_option("-Xms", initial_heap))
+    if max_metaspace:
+        result.append(_memory_option("-XX:MaxMetaspaceSize=", max_metaspace))
+    if string_deduplication:
+        result.append("-XX:+UseStringDeduplication")
+    if alpha_hashing_threshold is not None:
+        result.append(_alpha_hashing_option(alpha_hashing_threshold))
+    if options:
+        result.extend(options)
+    return _validate_jvm_options(result)
+
+
+def configure_jvm(
+    preset: Optional[str] = None,
+    initial_heap: Optional[str] = None,
+    max_metaspace: Optional[str] = None,
+    string_deduplication: bool = False,
+    options: Optional[List[str]] = None,
+    alpha_hashing_threshold: Optional[int] = None,
+) -> List[str]:
+    """Set the JVM tuning options, replacing DROOLS_JPY_JVM_PRESET
+
+    Must be called before the first ruleset is created, the JVM can only
+    be started once per process. DROOLS_JPY_JVM_OPTS is still appended.
+    """
+    global _jvm_tuning_options
+    jpy = sys.modules.get("jpy")
+    if jpy is not None and jpy.has_jvm():
+        raise RuntimeError("JVM is already running, options not applied")
+    _jvm_tuning_options = jvm_tuning_options(
+        preset,
+        initial_heap,
+        max_metaspace,
+        string_deduplication,
+        options,
+        alpha_hashing_threshold,
+    )
+    return list(_jvm_tuning_options)
+
+
+def _tuning_options() -> List[str]:
+    # DROOLS_JPY_JVM_PRESET: one of JVM_PRESETS, unless configure_jvm
+    #   was called
+    # DROOLS_JPY_ALPHA_HASHING_THRESHOLD: see jvm_tuning_options
+    # DROOLS_JPY_JVM_OPTS: space separated options passed through as is
+    if _jvm_tuning_options is not None:
+        options = list(_jvm_tuning_options)
+    else:
+        threshold = os.environ.get("DROOLS_JPY_ALPHA_HASHING_THRESHOLD")
+        try:
+            threshold = int(threshold) if threshold else None
+        except ValueError:
+            raise ValueError(
+                f"Invalid DROOLS_JPY_ALPHA_HASHING_THRESHOLD {threshold}"
+            ) from None
+        options = jvm_tuning_options(
+            preset=os.environ.get("DROOLS_JPY_JVM_PRESET"),
+            alpha_hashing_threshold=threshold,
+        )
+    options.extend(shlex.split(os.environ.get("DROOLS_JPY_JVM_OPTS", "")))
+    return _validate_jvm_options(options)
+
+
+def _cds_options() -> List[str]:
+    # Class Data Sharing, see drools.cds for creating the archive
+    #   DROOLS_JPY_JVM_CDS_ARCHIVE: use an existing archive
+    #   DROOLS_JPY_JVM_CDS_DUMP: write an archive when the JVM exits
+    options = []
+    dump_path = os.environ.get("DROOLS_JPY_JVM_CDS_DUMP")
+    archive_path = os.environ.get("DROOLS_JPY_JVM_CDS_ARCHIVE")
+    if dump_path:
+        options.append(f"-XX:ArchiveClassesAtExit={dump_path}")
+    elif archive_path:
+        if os.path.exists(archive_path):
+            logger.info("Using CDS archive: %s", archive_path)
+            options.append(f"-XX:SharedArchiveFile={archive_path}")
+        else:
+            logger.warning("CDS archive %s not found, ignoring", archive_path)
+    return options
+
+
 def _make_jpy_instance():
     jar_file_path = os.environ.get("DROOLS_JPY_CLASSPATH", _get_jar())
     if not os.path.exists(jar_file_path):
@@ -95,6 +272,9 @@ def _make_jpy_instance():
     tmp_dir = tempfile.gettempdir()
     jvm_options.append(f"-Djava.io.tmpdir={tmp_dir}")
 
+    jvm_options.extend(_cds_options())
+    jvm_options.extend(_tuning_options())
+
     jpyutil.init_jvm(
         jvm_maxmem=max_mem,
         jvm_classpath=[jar_file_path],
@@ -106,45 +286,741 @@ def _make_jpy_instance():
     return jpy.get_type(DEFAULT_DROOLS_CLASS)()
 
 
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[Any], Any]
+
+
+def _stdlib_codec() -> JsonCodec:
+    return JsonCodec(name="json", dumps=json.dumps, loads=json.loads)
+
+
+def _orjson_codec() -> JsonCodec:
+    import orjson
+
+    def dumps(obj):
+        # Non str keys are stringified like the stdlib does, not rejected
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode(
+                "utf-8"
+            )
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the stdlib encodes
+            return json.dumps(obj)
+
+    return JsonCodec(name="orjson", dumps=dumps, loads=orjson.loads)
+
+
+def _msgspec_codec() -> JsonCodec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj):
+        try:
+            return encoder.encode(obj).decode("utf-8")
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            # Values msgspec can't encode but the stdlib can
+            return json.dumps(obj)
+
+    return JsonCodec(name="msgspec", dumps=dumps, loads=decoder.decode)
+
+
+def _ujson_codec() -> JsonCodec:
+    import ujson
+
+    def dumps(obj):
+        try:
+            return ujson.dumps(obj)
+        except OverflowError:
+            # Integers beyond 64 bits, which the stdlib encodes
+            return json.dumps(obj)
+
+    return JsonCodec(name="ujson", dumps=dumps, loads=ujson.loads)
+
+
+# Ordered fastest first, "auto" picks the first one that is installed.
+# Objects a codec can't encode, such as integers beyond 64 bits for
+# orjson and ujson, are encoded with the stdlib instead of failing.
+JSON_CODECS: Dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "ujson": _ujson_codec,
+    "json": _stdlib_codec,
+}
+
+
+def _make_json_codec(name: str) -> JsonCodec:
+    name = name.lower().strip()
+    if name == "auto":
+        for factory in JSON_CODECS.values():
+            try:
+                return factory()
+            except ImportError:
+                continue
+    if name not in JSON_CODECS:
+        raise ValueError(
+            f"Unknown JSON codec {name}, "
+            f"expected one of auto, {', '.join(JSON_CODECS)}"
+        )
+    return JSON_CODECS[name]()
+
+
+def set_json_codec(name: str) -> JsonCodec:
+    """Select the JSON codec used for payloads crossing into the JVM
+
+    name is one of orjson, msgspec, ujson, json or auto for the fastest
+    installed codec. Raises ImportError if the codec is not installed.
+    """
+    global _json_codec
+    _json_codec = _make_json_codec(name)
+    logger.debug("Using JSON codec: %s", _json_codec.name)
+    return _json_codec
+
+
+def get_json_codec() -> JsonCodec:
+    return _json_codec
+
+
+def _load_default_json_codec() -> JsonCodec:
+    try:
+        return _make_json_codec(DROOLS_JPY_JSON_CODEC)
+    except (ImportError, ValueError) as e:
+        logger.warning(
+            "JSON codec %s unavailable, falling back to json: %s",
+            DROOLS_JPY_JSON_CODEC,
+            e,
+        )
+        return _stdlib_codec()
+
+
+_json_codec = _load_default_json_codec()
+
+
+def _json_dumps(obj) -> str:
+    return _json_codec.dumps(obj)
+
+
+def _json_loads(payload):
+    return _json_codec.loads(payload)
+
+
+# Metadata callers attach to facts, e.g. {"meta": {"uuid": ...}}, left
+# out when matching a fact to retract
+_FACT_META_KEY = "meta"
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+# Strings as a whole, so brackets and commas inside them are skipped
+_JSON_STRUCTURE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{},]')
+
+
+def _count_json_array(payload: str) -> int:
+    """Count the items of a JSON array without decoding them"""
+    start = _JSON_WHITESPACE.match(payload, 0).end()
+    if not payload.startswith("[", start):
+        raise ValueError("Expected a JSON array")
+    depth = 0
+    commas = 0
+    for token in _JSON_STRUCTURE.finditer(payload, start):
+        char = token.group()
+        if char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+            if depth == 0:
+                first = _JSON_WHITESPACE.match(payload, start + 1).end()
+                return 0 if first == token.start() else commas + 1
+        elif char == "," and depth == 1:
+            commas += 1
+    raise ValueError("Unterminated JSON array")
+
+
+_JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_JSON_SCALAR = re.compile(r"[^,\]}\s]*")
+
+
+def _json_value_end(payload: str, index: int) -> int:
+    """Index just past the JSON value starting at index, not decoding it"""
+    char = payload[index] if index < len(payload) else ""
+    if char == '"':
+        match = _JSON_STRING.match(payload, index)
+        if match is not None:
+            return match.end()
+    elif char and char in "[{":
+        depth = 0
+        for token in _JSON_STRUCTURE.finditer(payload, index):
+            char = token.group()
+            if char in "[{":
+                depth += 1
+            elif char in "]}":
+                depth -= 1
+                if depth == 0:
+                    return token.end()
+    else:
+        end = _JSON_SCALAR.match(payload, index).end()
+        if end > index:
+            return end
+    raise ValueError(f"Invalid JSON value at position {index}")
+
+
+def _json_members(
+    payload: str, index: int = 0
+) -> Iterator[Tuple[Optional[str], int, int]]:
+    """Yield the span of each member of the JSON array or object at index
+
+    Yields (key, start, end) with key None for array items, only the keys
+    are decoded.
+    """
+    index = _JSON_WHITESPACE.match(payload, index).end()
+    opener = payload[index] if index < len(payload) else ""
+    if not opener or opener not in "[{":
+        raise ValueError(f"Expected a JSON array or object at {index}")
+    closer = "]" if opener == "[" else "}"
+    index = _JSON_WHITESPACE.match(payload, index + 1).end()
+    if payload.startswith(closer, index):
+        return
+    while True:
+        key = None
+        if opener == "{":
+            match = _JSON_STRING.match(payload, index)
+            if match is None:
+                raise ValueError(f"Expected a key at position {index}")
+            key = json.loads(match.group())
+            index = _JSON_WHITESPACE.match(payload, match.end()).end()
+            if not payload.startswith(":", index):
+                raise ValueError(f"Expected : at position {index}")
+            index = _JSON_WHITESPACE.match(payload, index + 1).end()
+        end = _json_value_end(payload, index)
+        yield key, index, end
+        index = _JSON_WHITESPACE.match(payload, end).end()
+        if payload.startswith(closer, index):
+            return
+        if not payload.startswith(",", index):
+            raise ValueError(f"Expected , or {closer} at position {index}")
+        index = _JSON_WHITESPACE.match(payload, index + 1).end()
+
+
+def _raw_rule_match(payload: str, index: int = 0) -> Dict[str, Any]:
+    """A rule match with its match data left as JSON text
+
+    Only the name, matching_uuid and type of the HA format are decoded.
+    """
+    rule_match = {
+        key: payload[start:end]
+        for key, start, end in _json_members(payload, index)
+    }
+    if "name" in rule_match and "events" in rule_match:
+        for key in ("name", "matching_uuid", "type"):
+            if key in rule_match:
+                rule_match[key] = _json_loads(rule_match[key])
+    return rule_match
+
+
+def _iter_json_array(payload: str) -> Iterator[Any]:
+    """Decode the items of a JSON array one at a time
+
+    Only the current item is held in memory, unlike decoding the array
+    into a list up front. Always uses the stdlib decoder, the selected
+    JSON codec can only decode whole documents.
+    """
+    decoder = json.JSONDecoder()
+    index = _JSON_WHITESPACE.match(payload, 0).end()
+    if not payload.startswith("[", index):
+        raise ValueError("Expected a JSON array")
+    index = _JSON_WHITESPACE.match(payload, index + 1).end()
+    if payload.startswith("]", index):
+        return
+    while True:
+        item, index = decoder.raw_decode(payload, index)
+        yield item
+        index = _JSON_WHITESPACE.match(payload, index).end()
+        if payload.startswith("]", index):
+            return
+        if not payload.startswith(",", index):
+            raise ValueError(f"Expected , or ] at position {index}")
+        index = _JSON_WHITESPACE.match(payload, index + 1).end()
+
+
 def _to_json(obj):
     if isinstance(obj, dict):
-        return json.dumps(obj)
+        return _json_dumps(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        # Already serialized UTF-8 JSON, e.g. straight from a message bus
+        return str(obj, "utf-8")
     return obj
 
 
 def _from_json(obj):
     if isinstance(obj, str):
-        return json.loads(obj)
+        return _json_loads(obj)
     return obj
 
 
+class MetricsSink:
+    """Receives the timing of every engine call and every rule match
+
+    Install one with set_metrics_sink, drools.metrics.PrometheusMetrics
+    keeps latency histograms and exports them in the Prometheus format.
+    Payload sizes are in characters, ruleset_name is empty for calls that
+    don't belong to a session.
+    """
+
+    def record_call(
+        self,
+        ruleset_name: str,
+        method: str,
+        duration: float,
+        request_size: int,
+        response_size: int,
+    ) -> None:
+        pass
+
+    def record_match(self, ruleset_name: str, rule_name: str) -> None:
+        pass
+
+
+_metrics_sink: Optional[MetricsSink] = None
+
+
+def _payload_size(values) -> int:
+    return sum(len(value) for value in values if isinstance(value, str))
+
+
+def _session_ruleset_name(args) -> str:
+    if args and isinstance(args[0], int):
+        try:
+            return RulesetCollection.get_by_session_id(args[0]).name
+        except RulesetNotFoundError:
+            pass
+    return ""
+
+
+class _InstrumentedEngine:
+    """Engine proxy reporting every call to a MetricsSink
+
+    Only used while a sink is installed, so there is no cost otherwise.
+    """
+
+    def __init__(self, engine, sink: MetricsSink):
+        self._engine = engine
+        self._sink = sink
+
+    def __getattr__(self, method: str):
+        call = getattr(self._engine, method)
+        sink = self._sink
+
+        def instrumented(*args):
+            result = None
+            start = time.perf_counter()
+            try:
+                result = call(*args)
+                return result
+            finally:
+                sink.record_call(
+                    _session_ruleset_name(args),
+                    method,
+                    time.perf_counter() - start,
+                    _payload_size(args),
+                    _payload_size((result,)),
+                )
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, method, instrumented)
+        return instrumented
+
+
+def set_metrics_sink(sink: Optional[MetricsSink]) -> None:
+    """Report engine calls and matches to sink, None turns it off"""
+    global _metrics_sink
+    _metrics_sink = sink
+    RulesetCollection.refresh_api()
+
+
+def get_metrics_sink() -> Optional[MetricsSink]:
+    return _metrics_sink
+
+
 @dataclass(frozen=True)
 class Matches:
     data: dict = None
     matching_uuid: Optional[str] = None
 
 
+class _LazyBindings(Mapping):
+    """The bindings of a match, each decoded on first access"""
+
+    __slots__ = ("_payload", "_spans", "_values")
+
+    def __init__(self, payload: str):
+        self._payload = payload
+        self._spans = None
+        self._values = {}
+
+    def _index(self) -> Dict[str, Tuple[int, int]]:
+        if self._spans is None:
+            self._spans = {
+                key: (start, end)
+                for key, start, end in _json_members(self._payload)
+            }
+        return self._spans
+
+    def __getitem__(self, key: str):
+        if key in self._values:
+            return self._values[key]
+        start, end = self._index()[key]
+        value = self._values[key] = _json_loads(self._payload[start:end])
+        return value
+
+    def __iter__(self):
+        return iter(self._index())
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class LazyMatches:
+    """Matches holding the JSON text of the match data
+
+    data is a read only mapping decoding each binding on first access, so
+    callbacks of high fan-out rules only pay for the bindings they read.
+    Has no per instance dict, can't be modified and compares equal to a
+    Matches with the same data and matching_uuid.
+    """
+
+    __slots__ = ("_data", "_matching_uuid")
+
+    def __init__(self, data=None, matching_uuid: Optional[str] = None):
+        if isinstance(data, str):
+            if data.lstrip().startswith("{"):
+                data = _LazyBindings(data)
+            else:
+                data = _json_loads(data)
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_matching_uuid", matching_uuid)
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def matching_uuid(self) -> Optional[str]:
+        return self._matching_uuid
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __eq__(self, other):
+        if isinstance(other, (Matches, LazyMatches)):
+            return (
+                self.data == other.data
+                and self.matching_uuid == other.matching_uuid
+            )
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.data, self.matching_uuid))
+
+    def __repr__(self):
+        return (
+            f"LazyMatches(data={self.data!r}, "
+            f"matching_uuid={self.matching_uuid!r})"
+        )
+
+
 @dataclass
-class Ruleset:
+class RuleStats:
+    """Callback counters of one rule, kept on the Python side"""
+
+    name: str
+    fire_count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_fired_at: Optional[float] = None
+
+    def record(self, duration: float) -> None:
+        self.fire_count += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+        self.last_fired_at = time.time()
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.fire_count if self.fire_count else 0.0
+
+
+@dataclass(frozen=True)
+class FactStats:
+    """Facts sharing the same top level keys, size in JSON characters"""
+
+    count: int = 0
+    size: int = 0
+
+
+# Engine session stats keys by SessionStats field
+_ENGINE_STATS_KEYS = {
+    "number_of_rules": "numberOfRules",
+    "number_of_disabled_rules": "numberOfDisabledRules",
+    "rules_triggered": "rulesTriggered",
+    "events_processed": "eventsProcessed",
+    "events_matched": "eventsMatched",
+    "events_suppressed": "eventsSuppressed",
+    "permanent_storage_count": "permanentStorageCount",
+    "permanent_storage_size": "permanentStorageSize",
+    "async_responses": "asyncResponses",
+    "bytes_sent_on_async": "bytesSentOnAsync",
+    "base_level_memory": "baseLevelMemory",
+    "peak_memory": "peakMemory",
+}
+
+
+@dataclass(frozen=True)
+class SessionStats:
+    """Engine session stats combined with per rule callback counters
+
+    The counters come from sessionStats, rules from the callbacks
+    dispatched by this process. facts is only filled when requested as
+    it reads the whole working memory, partial_events only for HA
+    sessions. engine keeps the complete engine payload.
+    """
+
+    session_id: int
+    ruleset_name: str
+    number_of_rules: int = 0
+    number_of_disabled_rules: int = 0
+    rules_triggered: int = 0
+    events_processed: int = 0
+    events_matched: int = 0
+    events_suppressed: int = 0
+    permanent_storage_count: int = 0
+    permanent_storage_size: int = 0
+    async_responses: int = 0
+    bytes_sent_on_async: int = 0
+    base_level_memory: int = 0
+    peak_memory: int = 0
+    rules: Dict[str, RuleStats] = field(default_factory=dict)
+    facts: Optional[Dict[str, FactStats]] = None
+    partial_events: Optional[int] = None
+    engine: Dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_engine(
+        cls,
+        session_id: int,
+        ruleset_name: str,
+        engine_stats: Dict,
+        rules: Dict[str, RuleStats],
+        **kwargs,
+    ) -> "SessionStats":
+        counters = {
+            name: engine_stats[key] or 0
+            for name, key in _ENGINE_STATS_KEYS.items()
+            if key in engine_stats
+        }
+        return cls(
+            session_id=session_id,
+            ruleset_name=ruleset_name,
+            rules=rules,
+            engine=engine_stats,
+            **counters,
+            **kwargs,
+        )
+
+    def top_rules(self, count: int = 10) -> List[RuleStats]:
+        """The rules with the most callback time"""
+        return sorted(
+            self.rules.values(), key=lambda rule: rule.total_time, reverse=True
+        )[:count]
+
+
+def _fact_stats(facts: Iterator[dict]) -> Dict[str, FactStats]:
+    counts: Dict[str, List[int]] = {}
+    for fact in facts:
+        shape = ",".join(sorted(fact)) if isinstance(fact, dict) else ""
+        size = len(_json_dumps(fact))
+        entry = counts.setdefault(shape, [0, 0])
+        entry[0] += 1
+        entry[1] += size
+    return {
+        shape: FactStats(count=count, size=size)
+        for shape, (count, size) in counts.items()
+    }
+
+
+class RuleDispatcher:
+    """Deliver engine matches to the rules registered by name
+
+    Expects name, _rules, _rule_stats and _session_id attributes,
+    callbacks receive LazyMatches instead of Matches when lazy_matches
+    is set, the match data is then never decoded up front.
+    """
+
+    lazy_matches = False
+
+    def add_rule(self, rule: Rule) -> None:
+        self._rules[rule.name] = rule
+
+    def dispatch(self, serialized_result: str) -> None:
+        if self.lazy_matches and isinstance(serialized_result, str):
+            self._dispatch(_raw_rule_match(serialized_result))
+        else:
+            self._dispatch(_from_json(serialized_result))
+
+    def _process_response(self, payload: str) -> List[dict]:
+        """Dispatch the rule matches of an engine response and return them
+
+        With lazy_matches the match data is left as JSON text.
+        """
+        if payload is None:
+            return []
+
+        if self.lazy_matches:
+            results = [
+                _raw_rule_match(payload, start)
+                for _, start, _end in _json_members(payload)
+            ]
+        else:
+            results = _json_loads(payload)
+        for result in results:
+            self._dispatch(result)
+        return results
+
+    def _matches(self, data, matching_uuid: Optional[str] = None):
+        if self.lazy_matches:
+            return LazyMatches(data, matching_uuid)
+        return Matches(data=data, matching_uuid=matching_uuid)
+
+    def _dispatch(self, rule_match: dict) -> None:
+        # Check if this is the new format with "name", "events",
+        # and "matching_uuid"
+        if "name" in rule_match and "events" in rule_match:
+            # New HA format
+            rule_name = rule_match["name"]
+            events_data = rule_match["events"]
+            matching_uuid = rule_match.get("matching_uuid")
+            match_type = rule_match.get("type")
+
+            if match_type == "MATCHING_EVENT_RECOVERY":
+                logger.debug(
+                    "Recovering matching event for rule %s "
+                    "in session %s, matching_uuid=%s",
+                    rule_name,
+                    self._session_id,
+                    matching_uuid,
+                )
+
+            if rule_name in self._rules:
+                logger.debug(
+                    "Calling rule %s in session %s, matching_uuid=%s",
+                    rule_name,
+                    self._session_id,
+                    matching_uuid,
+                )
+                self._call_rule(
+                    rule_name, self._matches(events_data, matching_uuid)
+                )
+            else:
+                raise RuleNotFoundError(
+                    f"Rule {rule_name} does not exist "
+                    f"in Ruleset {self.name}"
+                )
+        else:
+            # Legacy format: iterate over items
+            for name, value in rule_match.items():
+                if name in self._rules:
+                    logger.debug(
+                        "Calling rule %s in session %s",
+                        name,
+                        self._session_id,
+                    )
+                    self._call_rule(name, self._matches(value))
+                else:
+                    raise RuleNotFoundError(
+                        f"Rule {name} does not exist "
+                        f"in Ruleset {self.name}"
+                    )
+
+    def _call_rule(self, rule_name: str, matches) -> None:
+        if _metrics_sink is not None:
+            _metrics_sink.record_match(self.name, rule_name)
+        rule_stats = self._rule_stats.get(rule_name)
+        if rule_stats is None:
+            rule_stats = self._rule_stats[rule_name] = RuleStats(rule_name)
+        start = time.perf_counter()
+        try:
+            with tracing.callback_span(self, rule_name):
+                self._rules[rule_name].callback(matches)
+        finally:
+            rule_stats.record(time.perf_counter() - start)
+
+
+@dataclass
+class Ruleset(RuleDispatcher):
     name: str
     serialized_ruleset: str
     ha_enabled: bool = field(default=False, repr=False)
+    lazy_matches: bool = field(default=False, repr=False)
+    profiling: bool = field(default=False, repr=False)
     _rules: dict = field(init=False, repr=False, default_factory=dict)
+    _rule_stats: dict = field(init=False, repr=False, default_factory=dict)
+    _upserted_facts: dict = field(init=False, repr=False, default_factory=dict)
     _session_id: int = field(init=False, repr=False, default=None)
+    _profiler: Any = field(init=False, repr=False, default=None)
 
     def __post_init__(self):
-        self._api = RulesetCollection.api()
+        if self.profiling:
+            self.enable_profiling()
+        else:
+            self._use_api(RulesetCollection.api())
         self.start_session()
         RulesetCollection.add(self)
 
-    def add_rule(self, rule: Rule) -> None:
-        self._rules[rule.name] = rule
-
     def define(self):
         return self.serialized_ruleset
 
-    def dispatch(self, serialized_result: str) -> None:
-        self._dispatch(_from_json(serialized_result))
+    def _use_api(self, api) -> None:
+        if self.profiling:
+            from .profiler import ProfilingEngine
+
+            api = ProfilingEngine(api, self._profiler)
+        self._api = api
+
+    def enable_profiling(self) -> None:
+        """Record engine time and activations per rule condition
+
+        Adds to the data of an earlier profiling run, see drools.profiler.
+        """
+        if self._profiler is None:
+            from .profiler import RuleProfiler
+
+            ruleset_data = _from_json(self.serialized_ruleset)
+            self._profiler = RuleProfiler(
+                ruleset_data.get("RuleSet", ruleset_data)
+            )
+        self.profiling = True
+        self._use_api(RulesetCollection.api())
+
+    def disable_profiling(self) -> None:
+        """Stop recording, the data collected so far is kept"""
+        self.profiling = False
+        self._use_api(RulesetCollection.api())
+
+    def profile_report(self):
+        """Conditions and rules ranked by time, as a ProfileReport"""
+        if self._profiler is None:
+            raise RuntimeError(f"Ruleset {self.name} was never profiled")
+        return self._profiler.report(self.get_session_stats())
 
     def start_session(self) -> int:
         if self._session_id:
@@ -152,48 +1028,207 @@ class Ruleset:
         logger.debug("Creating Drools Ruleset")
         self._session_id = self._api.createRuleset(self.serialized_ruleset)
         logger.debug("Ruleset Session ID : " + str(self._session_id))
+        RulesetCollection.add_session(self)
         return self._session_id
 
     def end_session(self) -> Dict:
         result = self._api.dispose(self._session_id)
+        RulesetCollection.remove_session(self._session_id)
+        self._upserted_facts.clear()
         if result:
-            return json.loads(result)
+            return _json_loads(result)
         return {}
 
     def get_facts(self):
         result = self._api.getFacts(self._session_id)
-        return json.loads(result)
+        return _json_loads(result)
+
+    def iter_facts(
+        self, filter: Optional[Callable[[dict], bool]] = None
+    ) -> Iterator[dict]:
+        """Yield the facts one at a time, optionally only those passing filter
+
+        The engine returns all facts as one string, the facts themselves
+        are decoded lazily so large working memories are never held as
+        one list.
+        """
+        for fact in _iter_json_array(self._api.getFacts(self._session_id)):
+            if filter is None or filter(fact):
+                yield fact
+
+    def iter_fact_pages(
+        self,
+        page_size: int,
+        filter: Optional[Callable[[dict], bool]] = None,
+    ) -> Iterator[List[dict]]:
+        """Yield lists of at most page_size facts"""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        page = []
+        for fact in self.iter_facts(filter):
+            page.append(fact)
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def count_facts(
+        self, filter: Optional[Callable[[dict], bool]] = None
+    ) -> int:
+        """Count the facts, without decoding them when there is no filter"""
+        if filter is None:
+            return _count_json_array(self._api.getFacts(self._session_id))
+        return sum(1 for _ in self.iter_facts(filter))
 
     def assert_event(self, serialized_fact: str):
-        return self._process_response(
-            self._api.assertEvent(self._session_id, serialized_fact)
-        )
+        with tracing.operation_span(self, "assert_event"):
+            return self._process_response(
+                self._api.assertEvent(self._session_id, serialized_fact)
+            )
+
+    def assert_events(self, serialized_events: List[str]):
+        """Assert a batch of events, dispatching matches in order"""
+        assert_event = self._api.assertEvent
+        with tracing.operation_span(self, "assert_events"):
+            for serialized_event in serialized_events:
+                self._process_response(
+                    assert_event(self._session_id, serialized_event)
+                )
 
     def assert_fact(self, serialized_fact: str):
-        return self._process_response(
-            self._api.assertFact(self._session_id, serialized_fact)
-        )
+        with tracing.operation_span(self, "assert_fact"):
+            return self._process_response(
+                self._api.assertFact(self._session_id, serialized_fact)
+            )
 
     def retract_fact(self, serialized_fact: str):
-        return self._process_response(
-            self._api.retractFact(self._session_id, serialized_fact)
-        )
+        with tracing.operation_span(self, "retract_fact"):
+            return self._process_response(
+                self._api.retractFact(self._session_id, serialized_fact)
+            )
+
+    def retract_facts(self, serialized_facts: List[str]) -> List[dict]:
+        """Retract a batch of facts, dispatching matches in order
+
+        Returns the rule matches of every retraction, in order.
+        """
+        retract_fact = self._api.retractFact
+        results = []
+        with tracing.operation_span(self, "retract_facts"):
+            for serialized_fact in serialized_facts:
+                results.extend(
+                    self._process_response(
+                        retract_fact(self._session_id, serialized_fact)
+                    )
+                )
+        return results
 
     def retract_matching_facts(
         self, serialized_fact: str, partial: bool, exclude_keys: List[str]
     ):
-        return self._process_response(
-            self._api.retractMatchingFacts(
-                self._session_id, serialized_fact, partial, exclude_keys
+        with tracing.operation_span(self, "retract_matching_facts"):
+            return self._process_response(
+                self._api.retractMatchingFacts(
+                    self._session_id, serialized_fact, partial, exclude_keys
+                )
             )
+
+    def retract_matching_facts_bulk(
+        self,
+        serialized_facts: List[str],
+        partial: bool,
+        exclude_keys: List[str],
+    ) -> List[dict]:
+        """Retract the facts matching each pattern, dispatching in order
+
+        Returns the rule matches of every retraction, in order.
+        """
+        retract_matching_facts = self._api.retractMatchingFacts
+        results = []
+        with tracing.operation_span(self, "retract_matching_facts_bulk"):
+            for serialized_fact in serialized_facts:
+                results.extend(
+                    self._process_response(
+                        retract_matching_facts(
+                            self._session_id,
+                            serialized_fact,
+                            partial,
+                            exclude_keys,
+                        )
+                    )
+                )
+        return results
+
+    def upsert_fact(
+        self,
+        key_fields: List[str],
+        serialized_fact: str,
+        dispatch_retractions: bool = False,
+    ):
+        """Replace the fact last upserted with the same key_fields values
+
+        The previous fact is remembered per key, so it is found without
+        reading the working memory and retracted exactly, ignoring meta.
+        Facts with other fields that share the key values are left alone,
+        and so are facts added with assert_fact, which are not tracked.
+        Matches fired by retracting the old fact, HA matches with a
+        matching_uuid included, are discarded unless dispatch_retractions
+        is set.
+        """
+        serialized_fact = _to_json(serialized_fact)
+        fact = _json_loads(serialized_fact)
+        if not key_fields:
+            raise ValueError("upsert_fact needs at least one key field")
+        missing = [key for key in key_fields if key not in fact]
+        if missing:
+            raise ValueError(f"Fact is missing key fields {missing}")
+        # Sorted so equal values give the same key whatever their order
+        key = json.dumps(
+            [[name, fact[name]] for name in key_fields], sort_keys=True
         )
 
+        with tracing.operation_span(self, "upsert_fact"):
+            old_fact = self._upserted_facts.get(key)
+            if old_fact is not None:
+                response = self._api.retractMatchingFacts(
+                    self._session_id, old_fact, False, [_FACT_META_KEY]
+                )
+                if dispatch_retractions:
+                    self._process_response(response)
+            response = self._api.assertFact(self._session_id, serialized_fact)
+            fact.pop(_FACT_META_KEY, None)
+            self._upserted_facts[key] = _json_dumps(fact)
+            return self._process_response(response)
+
     def session_stats(self) -> Dict:
         result = self._api.sessionStats(self._session_id)
         if result:
-            return json.loads(result)
+            return _json_loads(result)
         return {}
 
+    def get_session_stats(self, include_facts: bool = False) -> SessionStats:
+        """Structured session_stats with per rule callback counters
+
+        include_facts adds the count and size of the facts per shape, at
+        the cost of reading the whole working memory.
+        """
+        extra = {}
+        if include_facts:
+            extra["facts"] = _fact_stats(self.iter_facts())
+        if self.ha_enabled:
+            extra["partial_events"] = len(self.get_partial_event_ids())
+        return SessionStats.from_engine(
+            self._session_id,
+            self.name,
+            self.session_stats(),
+            {
+                name: replace(rule_stats)
+                for name, rule_stats in self._rule_stats.items()
+            },
+            **extra,
+        )
+
     def advance_time(self, amount: int, units: str):
         return self._api.advanceTime(self._session_id, amount, units)
 
@@ -235,77 +1270,39 @@ class Ruleset:
         """Get the IDs of partial events in working memory"""
         result = self._api.getPartialEventIds(self._session_id)
         if result:
-            return json.loads(result)
+            return _json_loads(result)
         return []
 
-    def _process_response(self, payload: str):
-        if payload is None:
-            return
-
-        results = json.loads(payload)
-        for result in results:
-            self._dispatch(result)
-
-    def _dispatch(self, rule_match: dict) -> None:
-        # Check if this is the new format with "name", "events",
-        # and "matching_uuid"
-        if "name" in rule_match and "events" in rule_match:
-            # New HA format
-            rule_name = rule_match["name"]
-            events_data = rule_match["events"]
-            matching_uuid = rule_match.get("matching_uuid")
-            match_type = rule_match.get("type")
-
-            if match_type == "MATCHING_EVENT_RECOVERY":
-                logger.debug(
-                    "Recovering matching event for rule %s "
-                    "in session %s, matching_uuid=%s",
-                    rule_name,
-                    self._session_id,
-                    matching_uuid,
-                )
-
-            if rule_name in self._rules:
-                logger.debug(
-                    "Calling rule %s in session %s, matching_uuid=%s",
-                    rule_name,
-                    self._session_id,
-                    matching_uuid,
-                )
-                self._rules[rule_name].callback(
-                    Matches(data=events_data, matching_uuid=matching_uuid)
-                )
-            else:
-                raise RuleNotFoundError(
-                    f"Rule {rule_name} does not exist "
-                    f"in Ruleset {self.name}"
-                )
-        else:
-            # Legacy format: iterate over items
-            for name, value in rule_match.items():
-                if name in self._rules:
-                    logger.debug(
-                        "Calling rule %s in session %s",
-                        name,
-                        self._session_id,
-                    )
-                    self._rules[name].callback(Matches(data=value))
-                else:
-                    raise RuleNotFoundError(
-                        f"Rule {name} does not exist "
-                        f"in Ruleset {self.name}"
-                    )
-
 
 @dataclass
 class RulesetCollection:
     __cached_objects: ClassVar[Dict[str, Ruleset]] = {}
+    __session_index: ClassVar[Dict[int, Ruleset]] = {}
     engine = None
+    _api = None
 
     @classmethod
     def api(cls):
         cls.create_engine()
-        return cls.engine
+        if cls._api is None:
+            api = cls.engine
+            if _metrics_sink is not None:
+                api = _InstrumentedEngine(api, _metrics_sink)
+            tracer = tracing.get_tracer()
+            if tracer is not None:
+                api = tracing.TracedEngine(api, tracer)
+            cls._api = api
+        return cls._api
+
+    @classmethod
+    def refresh_api(cls):
+        """Apply the metrics sink and tracer to the engine and every ruleset"""
+        cls._api = None
+        if cls.engine is None:
+            return
+        api = cls.api()
+        for ruleset in cls.__cached_objects.values():
+            ruleset._use_api(api)
 
     @classmethod
     def create_engine(cls):
@@ -322,39 +1319,51 @@ class RulesetCollection:
         if cls.engine is not None:
             cls.engine.shutdown()
             cls.engine = None
+            cls._api = None
 
     @classmethod
     def initialize_ha(
         cls, uuid: str, worker_name: str, db_params: dict, config: dict = None
     ):
         """Initialize HA mode with UUID and database configuration"""
-        cls.create_engine()
-        db_params_json = json.dumps(db_params)
-        config_json = json.dumps(config) if config else json.dumps({})
-        cls.engine.initializeHA(uuid, worker_name, db_params_json, config_json)
+        db_params_json = _json_dumps(db_params)
+        config_json = _json_dumps(config) if config else _json_dumps({})
+        cls.api().initializeHA(uuid, worker_name, db_params_json, config_json)
 
     @classmethod
     def enable_leader(cls):
         """Enable leader mode and start writing states to database"""
-        cls.create_engine()
-        cls.engine.enableLeader()
+        cls.api().enableLeader()
 
     @classmethod
     def disable_leader(cls):
         """Disable leader mode and stop writing to database"""
-        cls.engine.disableLeader()
+        cls.api().disableLeader()
 
     @classmethod
     def get_ha_stats(cls) -> Dict:
         """Get current HA statistics"""
-        result = cls.engine.getHAStats()
+        result = cls.api().getHAStats()
         if result:
-            return json.loads(result)
+            return _json_loads(result)
         return {}
 
     @classmethod
     def add(cls, ruleset: Ruleset):
+        previous = cls.__cached_objects.get(ruleset.name)
+        if previous is not None:
+            cls.remove_session(previous._session_id)
         cls.__cached_objects[ruleset.name] = ruleset
+        cls.add_session(ruleset)
+
+    @classmethod
+    def add_session(cls, ruleset: Ruleset):
+        if ruleset._session_id is not None:
+            cls.__session_index[ruleset._session_id] = ruleset
+
+    @classmethod
+    def remove_session(cls, session_id: int):
+        cls.__session_index.pop(session_id, None)
 
     @classmethod
     def get(cls, ruleset_name: str) -> Ruleset:
@@ -367,30 +1376,125 @@ class RulesetCollection:
 
     @classmethod
     def get_by_session_id(cls, session_id: int) -> Ruleset:
-        for obj in cls.__cached_objects.values():
-            if obj._session_id == session_id:
-                return obj
+        try:
+            return cls.__session_index[session_id]
+        except KeyError:
+            raise RulesetNotFoundError(
+                "Ruleset with session id " + str(session_id) + " not found"
+            ) from None
 
-        raise RulesetNotFoundError(
-            "Ruleset with session id " + str(session_id) + " not found"
-        )
 
+class GarbageCollector:
+    """Decides when post() triggers java.lang.System.gc()
 
-message_counter = 0
-java_lang_System = None
+    Posts are counted with an itertools.count, whose increment is atomic,
+    so posting threads never wait on each other and exactly one of them
+    sees each multiple of gc_after, which collects exactly once. With the
+    time policy a collection already in progress in another thread is
+    never repeated.
+    """
+
+    def __init__(
+        self,
+        policy: str = DROOLS_JPY_GC_POLICY,
+        gc_after: int = DROOLS_JPY_GC_AFTER,
+        heap_threshold: float = DROOLS_JPY_GC_HEAP_THRESHOLD,
+        interval: float = DROOLS_JPY_GC_INTERVAL,
+    ):
+        if policy not in GC_POLICIES:
+            raise ValueError(
+                f"Invalid GC policy {policy}, "
+                f"expected one of {', '.join(GC_POLICIES)}"
+            )
+        self.policy = policy
+        self.gc_after = gc_after
+        self.heap_threshold = heap_threshold
+        self.interval = interval
+        self._posts = itertools.count(1)
+        self._collecting = threading.Lock()
+        self._last_collection = time.monotonic()
+        self._java_lang_System = None
+        self._memory_mx_bean = None
+        self.collections = 0
+        self.skipped = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.heap_occupancy = None
+
+    def post(self) -> None:
+        if self.policy == "off":
+            return
+        if self.policy == "time":
+            if time.monotonic() - self._last_collection >= self.interval:
+                self._collect()
+            return
+        if self.gc_after > 0 and next(self._posts) % self.gc_after == 0:
+            self._collect()
+
+    def stats(self) -> Dict:
+        return {
+            "policy": self.policy,
+            "collections": self.collections,
+            "skipped": self.skipped,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "heap_occupancy": self.heap_occupancy,
+        }
+
+    def sample_heap_occupancy(self) -> float:
+        """Fraction of the maximum JVM heap currently in use"""
+        if self._memory_mx_bean is None:
+            import jpy
+
+            management_factory = jpy.get_type(
+                "java.lang.management.ManagementFactory"
+            )
+            self._memory_mx_bean = management_factory.getMemoryMXBean()
+        usage = self._memory_mx_bean.getHeapMemoryUsage()
+        limit = usage.getMax()
+        if limit <= 0:
+            limit = usage.getCommitted()
+        return usage.getUsed() / limit
+
+    def _collect(self) -> None:
+        # Each multiple of gc_after is honoured, an interval only once
+        if not self._collecting.acquire(blocking=self.policy != "time"):
+            return
+        try:
+            if self.policy == "time":
+                if time.monotonic() - self._last_collection < self.interval:
+                    return
+            elif self.policy == "heap":
+                self.heap_occupancy = self.sample_heap_occupancy()
+                if self.heap_occupancy < self.heap_threshold:
+                    self.skipped += 1
+                    return
+
+            if self._java_lang_System is None:
+                import jpy
+
+                self._java_lang_System = jpy.get_type("java.lang.System")
+            start = time.perf_counter()
+            self._java_lang_System.gc()
+            elapsed = time.perf_counter() - start
+            self._last_collection = time.monotonic()
+            self.collections += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+        finally:
+            self._collecting.release()
+
+
+garbage_collector = GarbageCollector()
 
 
 def call_garbage_collector():
-    global message_counter, java_lang_System
-    if DROOLS_JPY_GC_AFTER > 0 and message_counter > DROOLS_JPY_GC_AFTER:
-        if java_lang_System is None:
-            import jpy
+    garbage_collector.post()
 
-            java_lang_System = jpy.get_type("java.lang.System")
-        java_lang_System.gc()
-        message_counter = 0
-    else:
-        message_counter += 1
+
+def gc_stats() -> Dict:
+    """Explicit garbage collections triggered by post and their cost"""
+    return garbage_collector.stats()
 
 
 def post(ruleset_name: str, serialized_event: str):
@@ -406,6 +1510,12 @@ def assert_event(ruleset_name: str, serialized_event: str):
     )
 
 
+def assert_events(ruleset_name: str, serialized_events: List[str]):
+    return RulesetCollection.get(ruleset_name).assert_events(
+        [_to_json(serialized_event) for serialized_event in serialized_events]
+    )
+
+
 def assert_fact(ruleset_name: str, serialized_fact: str):
     return RulesetCollection.get(ruleset_name).assert_fact(
         _to_json(serialized_fact)
@@ -418,6 +1528,12 @@ def retract_fact(ruleset_name: str, serialized_fact: str):
     )
 
 
+def retract_facts(ruleset_name: str, serialized_facts: List[str]):
+    return RulesetCollection.get(ruleset_name).retract_facts(
+        [_to_json(serialized_fact) for serialized_fact in serialized_facts]
+    )
+
+
 def retract_matching_facts(
     ruleset_name: str,
     serialized_fact: str,
@@ -429,6 +1545,30 @@ def retract_matching_facts(
     )
 
 
+def retract_matching_facts_bulk(
+    ruleset_name: str,
+    serialized_facts: List[str],
+    partial: bool,
+    exclude_keys: List[str],
+):
+    return RulesetCollection.get(ruleset_name).retract_matching_facts_bulk(
+        [_to_json(serialized_fact) for serialized_fact in serialized_facts],
+        partial,
+        exclude_keys,
+    )
+
+
+def upsert_fact(
+    ruleset_name: str,
+    key_fields: List[str],
+    serialized_fact: str,
+    dispatch_retractions: bool = False,
+):
+    return RulesetCollection.get(ruleset_name).upsert_fact(
+        key_fields, serialized_fact, dispatch_retractions
+    )
+
+
 def end_session(ruleset_name: str) -> Dict:
     return RulesetCollection.get(ruleset_name).end_session()
 
@@ -437,10 +1577,38 @@ def session_stats(ruleset_name: str) -> Dict:
     return RulesetCollection.get(ruleset_name).session_stats()
 
 
+def get_session_stats(
+    ruleset_name: str, include_facts: bool = False
+) -> SessionStats:
+    return RulesetCollection.get(ruleset_name).get_session_stats(include_facts)
+
+
 def get_facts(ruleset_name: str):
     return RulesetCollection.get(ruleset_name).get_facts()
 
 
+def iter_facts(
+    ruleset_name: str, filter: Optional[Callable[[dict], bool]] = None
+) -> Iterator[dict]:
+    return RulesetCollection.get(ruleset_name).iter_facts(filter)
+
+
+def iter_fact_pages(
+    ruleset_name: str,
+    page_size: int,
+    filter: Optional[Callable[[dict], bool]] = None,
+) -> Iterator[List[dict]]:
+    return RulesetCollection.get(ruleset_name).iter_fact_pages(
+        page_size, filter
+    )
+
+
+def count_facts(
+    ruleset_name: str, filter: Optional[Callable[[dict], bool]] = None
+) -> int:
+    return RulesetCollection.get(ruleset_name).count_facts(filter)
+
+
 def get_pending_events(ruleset_name: str):
     return RulesetCollection.get(ruleset_name).get_pending_events()
 
@@ -0,0 +1,149 @@
+"""Per session worker threads for rule evaluation
+
+Drools sessions are independent, so rulesets can be evaluated in
+parallel as long as the calls for one session stay ordered. The
+SessionScheduler gives every ruleset a fixed worker thread, chosen as the
+worker with the fewest rulesets when it is first seen, and queues its
+calls there. Rule callbacks run on the worker thread.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from . import ruleset, tracing
+
+logger = logging.getLogger(__name__)
+
+
+class SessionScheduler:
+    def __init__(self, workers: int = None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("SessionScheduler needs at least one worker")
+        # jpy attaches each worker thread to the JVM on its first call
+        self._executors = [
+            ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"drools-worker-{index}"
+            )
+            for index in range(workers)
+        ]
+        self._lock = threading.Lock()
+        self._assignments: Dict[str, int] = {}
+        self._rulesets = [0] * workers
+        self._queued = [0] * workers
+        self._completed = [0] * workers
+
+    @property
+    def workers(self) -> int:
+        return len(self._executors)
+
+    def worker_for(self, ruleset_name: str) -> int:
+        with self._lock:
+            index = self._assignments.get(ruleset_name)
+            if index is None:
+                index = self._rulesets.index(min(self._rulesets))
+                self._assignments[ruleset_name] = index
+                self._rulesets[index] += 1
+                logger.debug(
+                    "Ruleset %s assigned to worker %s", ruleset_name, index
+                )
+            return index
+
+    def executor_for(self, ruleset_name: str) -> ThreadPoolExecutor:
+        """The single threaded executor of a ruleset, e.g. for AsyncRuleset"""
+        return self._executors[self.worker_for(ruleset_name)]
+
+    def release(self, ruleset_name: str) -> None:
+        """Forget the worker assignment of a ruleset"""
+        with self._lock:
+            index = self._assignments.pop(ruleset_name, None)
+            if index is not None:
+                self._rulesets[index] -= 1
+
+    def submit(self, ruleset_name: str, func: Callable, *args) -> Future:
+        index = self.worker_for(ruleset_name)
+        with self._lock:
+            self._queued[index] += 1
+        future = self._executors[index].submit(
+            tracing.bind_context(func), *args
+        )
+        future.add_done_callback(lambda _: self._done(index))
+        return future
+
+    def _done(self, index: int) -> None:
+        with self._lock:
+            self._queued[index] -= 1
+            self._completed[index] += 1
+
+    def post(self, ruleset_name: str, serialized_event: str) -> Future:
+        return self.submit(
+            ruleset_name, ruleset.post, ruleset_name, serialized_event
+        )
+
+    def assert_event(self, ruleset_name: str, serialized_event: str) -> Future:
+        return self.submit(
+            ruleset_name, ruleset.assert_event, ruleset_name, serialized_event
+        )
+
+    def assert_events(
+        self, ruleset_name: str, serialized_events: List[str]
+    ) -> Future:
+        return self.submit(
+            ruleset_name,
+            ruleset.assert_events,
+            ruleset_name,
+            serialized_events,
+        )
+
+    def assert_fact(self, ruleset_name: str, serialized_fact: str) -> Future:
+        return self.submit(
+            ruleset_name, ruleset.assert_fact, ruleset_name, serialized_fact
+        )
+
+    def retract_fact(self, ruleset_name: str, serialized_fact: str) -> Future:
+        return self.submit(
+            ruleset_name, ruleset.retract_fact, ruleset_name, serialized_fact
+        )
+
+    def retract_matching_facts(
+        self,
+        ruleset_name: str,
+        serialized_fact: str,
+        partial: bool,
+        exclude_keys: List[str],
+    ) -> Future:
+        return self.submit(
+            ruleset_name,
+            ruleset.retract_matching_facts,
+            ruleset_name,
+            serialized_fact,
+            partial,
+            exclude_keys,
+        )
+
+    def end_session(self, ruleset_name: str) -> Future:
+        future = self.submit(ruleset_name, ruleset.end_session, ruleset_name)
+        future.add_done_callback(lambda _: self.release(ruleset_name))
+        return future
+
+    def queue_depths(self) -> List[int]:
+        """Calls waiting or running on each worker"""
+        with self._lock:
+            return list(self._queued)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": len(self._executors),
+                "rulesets": list(self._rulesets),
+                "queued": list(self._queued),
+                "completed": list(self._completed),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for executor in self._executors:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,349 @@
+"""Spread rulesets over several worker processes, each with its own JVM
+
+One JVM is limited to the heap set by DROOLS_JPY_JVM_MAXMEM and to what a
+single engine can evaluate. A ShardedEngine starts worker processes that
+each host an AstRulesEngine and a subset of the rulesets. Calls are
+routed by ruleset name, the worker returns the raw match payloads and
+the parent dispatches them to the rules registered on its
+ShardedRuleset, so callbacks always run in the parent process:
+
+    engine = ShardedEngine(shards=4)
+    rs = engine.create_ruleset(name, serialized_ruleset)
+    rs.add_rule(Rule("r1", callback))
+    engine.post(name, event).result()
+    engine.shutdown()
+
+Calls return concurrent.futures.Future objects and callbacks run on the
+receiver thread of the shard. Calls for one ruleset keep their order,
+timer matches from the async channel of a worker are forwarded too.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from . import ruleset as ruleset_module
+from .exceptions import RulesetNotFoundError, ShardFailedError
+from .ruleset import (
+    RuleDispatcher,
+    Ruleset,
+    RulesetCollection,
+    _json_loads,
+    _to_json,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between liveness checks of an idle worker process
+_POLL_INTERVAL = 1.0
+
+# Calls answered with a match payload that the parent dispatches
+_PAYLOAD_METHODS = {
+    "post": "assertEvent",
+    "assert_event": "assertEvent",
+    "assert_fact": "assertFact",
+    "retract_fact": "retractFact",
+    "retract_matching_facts": "retractMatchingFacts",
+}
+
+
+def _forward_async_matches(response_queue) -> None:
+    from .dispatch import FrameReader, establish_async_channel
+
+    async def forward():
+        reader, writer = await establish_async_channel()
+        frame_reader = FrameReader(reader)
+        try:
+            while True:
+                payloads = await frame_reader.read_frames()
+                if not payloads:
+                    break
+                for payload in payloads:
+                    if not payload:
+                        continue
+                    try:
+                        data = _json_loads(payload)
+                        name = RulesetCollection.get_by_session_id(
+                            data["session_id"]
+                        ).name
+                    except RulesetNotFoundError as e:
+                        # The session ended after its timer fired
+                        logger.warning("Dropping async matches: %s", e)
+                        continue
+                    except Exception:
+                        logger.exception("Invalid async channel frame")
+                        continue
+                    for result in data["result"]:
+                        response_queue.put(("match", name, result))
+        finally:
+            writer.close()
+
+    try:
+        asyncio.run(forward())
+    except Exception:
+        logger.exception("Async channel of shard failed")
+
+
+def _picklable(error: Exception) -> Exception:
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _shard_main(request_queue, response_queue) -> None:
+    try:
+        RulesetCollection.create_engine()
+    except Exception as e:
+        # Fail every call instead of leaving the parent waiting
+        startup_error = _picklable(e)
+    else:
+        startup_error = None
+        threading.Thread(
+            target=_forward_async_matches, args=(response_queue,), daemon=True
+        ).start()
+
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        request_id, method, name, args = request
+        if startup_error is not None:
+            response_queue.put(("result", request_id, None, startup_error))
+            continue
+        try:
+            if method == "create":
+                Ruleset(name=name, serialized_ruleset=args[0])
+                result = None
+            elif method in _PAYLOAD_METHODS:
+                if method == "post":
+                    ruleset_module.call_garbage_collector()
+                rs = RulesetCollection.get(name)
+                result = getattr(rs._api, _PAYLOAD_METHODS[method])(
+                    rs._session_id, *args
+                )
+            else:
+                result = getattr(ruleset_module, method)(name, *args)
+            response_queue.put(("result", request_id, result, None))
+        except Exception as e:
+            response_queue.put(("result", request_id, None, _picklable(e)))
+
+    if startup_error is None:
+        RulesetCollection.shutdown()
+    response_queue.put(("stop",))
+
+
+@dataclass
+class ShardedRuleset(RuleDispatcher):
+    name: str
+    shard: int
+    _rules: dict = field(init=False, repr=False, default_factory=dict)
+    _rule_stats: dict = field(init=False, repr=False, default_factory=dict)
+    _session_id: int = field(init=False, repr=False, default=None)
+
+
+class _Shard:
+    def __init__(self, index: int, context):
+        self.index = index
+        self.requests = context.Queue()
+        self.responses = context.Queue()
+        self.pending: Dict[int, Tuple[Future, str, str]] = {}
+        self.lock = threading.Lock()
+        self.error: Optional[Exception] = None
+        self.process = context.Process(
+            target=_shard_main,
+            args=(self.requests, self.responses),
+            name=f"drools-shard-{index}",
+            daemon=True,
+        )
+
+
+class ShardedEngine:
+    def __init__(self, shards: int = 2, start_method: str = "spawn"):
+        if shards < 1:
+            raise ValueError("ShardedEngine needs at least one shard")
+        context = multiprocessing.get_context(start_method)
+        self._request_ids = itertools.count()
+        # Guards _rulesets, end_session forgets rulesets on receiver threads
+        self._lock = threading.Lock()
+        self._rulesets: Dict[str, ShardedRuleset] = {}
+        self._shards = [_Shard(index, context) for index in range(shards)]
+        self._receivers = []
+        for shard in self._shards:
+            shard.process.start()
+            receiver = threading.Thread(
+                target=self._receive,
+                args=(shard,),
+                name=f"drools-shard-{shard.index}-receiver",
+                daemon=True,
+            )
+            receiver.start()
+            self._receivers.append(receiver)
+
+    @property
+    def shards(self) -> int:
+        return len(self._shards)
+
+    def _fail_pending(self, shard: _Shard, error: Exception) -> None:
+        with shard.lock:
+            shard.error = shard.error or error
+            pending = list(shard.pending.values())
+            shard.pending.clear()
+        for future, _, _ in pending:
+            if not future.done():
+                future.set_exception(shard.error)
+
+    def _receive(self, shard: _Shard) -> None:
+        while True:
+            try:
+                message = shard.responses.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if shard.process.is_alive():
+                    continue
+                self._fail_pending(
+                    shard,
+                    ShardFailedError(
+                        f"Shard {shard.index} exited with code "
+                        f"{shard.process.exitcode}"
+                    ),
+                )
+                break
+            if message[0] == "stop":
+                break
+            if message[0] == "match":
+                _, name, serialized_result = message
+                try:
+                    self.get(name).dispatch(serialized_result)
+                except Exception:
+                    logger.exception("Dispatch failed for ruleset %s", name)
+                continue
+
+            _, request_id, result, error = message
+            with shard.lock:
+                entry = shard.pending.pop(request_id, None)
+            if entry is None:
+                # Already failed, e.g. by shutdown
+                continue
+            future, method, name = entry
+            if error is not None:
+                future.set_exception(error)
+                continue
+            try:
+                if method in _PAYLOAD_METHODS:
+                    self.get(name)._process_response(result)
+                    result = None
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _call(self, shard: _Shard, method: str, name: str, *args) -> Future:
+        future = Future()
+        request_id = next(self._request_ids)
+        with shard.lock:
+            if shard.error is not None:
+                future.set_exception(shard.error)
+                return future
+            shard.pending[request_id] = (future, method, name)
+        shard.requests.put((request_id, method, name, args))
+        return future
+
+    def _route(self, method: str, name: str, *args) -> Future:
+        shard = self._shards[self.get(name).shard]
+        return self._call(shard, method, name, *args)
+
+    def create_ruleset(
+        self, name: str, serialized_ruleset: str
+    ) -> ShardedRuleset:
+        """Compile a ruleset on the shard with the fewest rulesets
+
+        Raises ValueError if a ruleset with the same name exists.
+        """
+        with self._lock:
+            if name in self._rulesets:
+                raise ValueError(f"Ruleset {name} already exists")
+            counts = [0] * len(self._shards)
+            for rs in self._rulesets.values():
+                counts[rs.shard] += 1
+            index = counts.index(min(counts))
+            rs = ShardedRuleset(name=name, shard=index)
+            self._rulesets[name] = rs
+        try:
+            self._call(
+                self._shards[index], "create", name, serialized_ruleset
+            ).result()
+        except Exception:
+            self._forget(rs)
+            raise
+        return rs
+
+    def _forget(self, rs: ShardedRuleset) -> None:
+        with self._lock:
+            if self._rulesets.get(rs.name) is rs:
+                del self._rulesets[rs.name]
+
+    def get(self, name: str) -> ShardedRuleset:
+        with self._lock:
+            rs = self._rulesets.get(name)
+        if rs is None:
+            raise RulesetNotFoundError("Ruleset " + name + " not found")
+        return rs
+
+    def post(self, name: str, serialized_event: str) -> Future:
+        return self._route("post", name, _to_json(serialized_event))
+
+    def assert_event(self, name: str, serialized_event: str) -> Future:
+        return self._route("assert_event", name, _to_json(serialized_event))
+
+    def assert_fact(self, name: str, serialized_fact: str) -> Future:
+        return self._route("assert_fact", name, _to_json(serialized_fact))
+
+    def retract_fact(self, name: str, serialized_fact: str) -> Future:
+        return self._route("retract_fact", name, _to_json(serialized_fact))
+
+    def retract_matching_facts(
+        self,
+        name: str,
+        serialized_fact: str,
+        partial: bool,
+        exclude_keys: List[str],
+    ) -> Future:
+        return self._route(
+            "retract_matching_facts",
+            name,
+            _to_json(serialized_fact),
+            partial,
+            exclude_keys,
+        )
+
+    def get_facts(self, name: str) -> Future:
+        return self._route("get_facts", name)
+
+    def session_stats(self, name: str) -> Future:
+        return self._route("session_stats", name)
+
+    def end_session(self, name: str) -> Future:
+        rs = self.get(name)
+        future = self._call(self._shards[rs.shard], "end_session", name)
+        future.add_done_callback(lambda _: self._forget(rs))
+        return future
+
+    def shutdown(self, timeout: float = 30) -> None:
+        for shard in self._shards:
+            shard.requests.put(None)
+        for shard, receiver in zip(self._shards, self._receivers):
+            receiver.join(timeout)
+            shard.process.join(timeout)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            self._fail_pending(
+                shard, ShardFailedError(f"Shard {shard.index} was shut down")
+            )
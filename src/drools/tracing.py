@@ -0,0 +1,129 @@
+"""Optional OpenTelemetry tracing from event assert to rule callback
+
+Needs opentelemetry-api, installed with the tracing extra:
+
+    from drools import tracing
+
+    tracing.enable_tracing()
+
+Every assert, retract or upsert of a Ruleset opens a span with a child
+span per engine call and one per rule callback dispatched from its
+response. Matches that arrive later on the async channel, such as timer
+and time window matches, carry no trace context from the engine, their
+dispatch span is linked to the last assert span of the same session.
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict
+
+TRACER_NAME = "drools_jpy"
+
+_tracer = None
+_link_type = None
+_NO_SPAN = nullcontext()
+
+
+def enable_tracing(tracer_provider=None) -> None:
+    """Trace with tracer_provider, or the globally configured one
+
+    Raises ImportError if opentelemetry-api is not installed.
+    """
+    global _tracer, _link_type
+    from opentelemetry import trace
+
+    _link_type = trace.Link
+    _tracer = trace.get_tracer(TRACER_NAME, tracer_provider=tracer_provider)
+    _refresh_api()
+
+
+def disable_tracing() -> None:
+    global _tracer
+    _tracer = None
+    _refresh_api()
+
+
+def get_tracer():
+    return _tracer
+
+
+def _refresh_api() -> None:
+    from .ruleset import RulesetCollection
+
+    RulesetCollection.refresh_api()
+
+
+def _attributes(ruleset) -> Dict:
+    attributes = {"drools.ruleset": ruleset.name}
+    if ruleset._session_id is not None:
+        attributes["drools.session_id"] = ruleset._session_id
+    return attributes
+
+
+@contextmanager
+def _operation_span(ruleset, operation: str):
+    with _tracer.start_as_current_span(
+        f"drools.{operation}", attributes=_attributes(ruleset)
+    ) as span:
+        # Remembered so later async matches can be linked to it
+        ruleset._trace_link = span.get_span_context()
+        yield span
+
+
+def operation_span(ruleset, operation: str):
+    """Span around one operation on a ruleset, a no-op when disabled"""
+    if _tracer is None:
+        return _NO_SPAN
+    return _operation_span(ruleset, operation)
+
+
+def callback_span(ruleset, rule_name: str):
+    if _tracer is None:
+        return _NO_SPAN
+    attributes = _attributes(ruleset)
+    attributes["drools.rule"] = rule_name
+    return _tracer.start_as_current_span(
+        "drools.callback", attributes=attributes
+    )
+
+
+def async_dispatch_span(ruleset):
+    if _tracer is None:
+        return _NO_SPAN
+    span_context = getattr(ruleset, "_trace_link", None)
+    links = [_link_type(span_context)] if span_context is not None else []
+    return _tracer.start_as_current_span(
+        "drools.async_dispatch", attributes=_attributes(ruleset), links=links
+    )
+
+
+def bind_context(func: Callable) -> Callable:
+    """Run func in the current trace context when called from a thread"""
+    if _tracer is None:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+class TracedEngine:
+    """Engine proxy opening a span for every call"""
+
+    def __init__(self, engine, tracer):
+        self._engine = engine
+        self._tracer = tracer
+
+    def __getattr__(self, method: str):
+        call = getattr(self._engine, method)
+        tracer = self._tracer
+        name = f"drools.engine.{method}"
+
+        def traced(*args):
+            attributes = {}
+            if args and isinstance(args[0], int):
+                attributes["drools.session_id"] = args[0]
+            with tracer.start_as_current_span(name, attributes=attributes):
+                return call(*args)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, method, traced)
+        return traced
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import threading
+from unittest import mock
+
+import pytest
+import yaml
+
+from drools.async_ruleset import AsyncRuleset
+from drools.exceptions import RuleNotFoundError
+from drools.rule import Rule
+from drools.ruleset import Matches, Ruleset
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+@pytest.mark.asyncio
+async def test_async_assert_event():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    loop_thread = threading.get_ident()
+    callback_threads = []
+
+    def my_callback(matches):
+        callback_threads.append(threading.get_ident())
+
+    callback = mock.Mock(wraps=my_callback)
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = await AsyncRuleset.create(
+        ruleset_data["name"], json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", callback))
+
+    await rs.assert_event(json.dumps(dict(i=67)))
+    await rs.end_session()
+
+    callback.assert_called_with(Matches(data={"first": {"i": 67}}))
+    assert callback_threads == [loop_thread]
+
+
+@pytest.mark.asyncio
+async def test_async_calls_keep_order():
+    test_data = load_ast("asts/rules_with_and.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = AsyncRuleset(
+        Ruleset(
+            name=ruleset_data["name"],
+            serialized_ruleset=json.dumps(ruleset_data),
+        )
+    )
+    rs.add_rule(Rule("r1", my_callback))
+
+    await asyncio.gather(
+        *[rs.assert_event(json.dumps(dict(i=i))) for i in range(4, 24)]
+    )
+    await rs.assert_events([json.dumps(dict(i=i)) for i in range(24, 30)])
+    await rs.end_session()
+
+    assert my_callback.call_args_list == [
+        mock.call(Matches(data={"m": {"i": i}})) for i in range(4, 30)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_assert_events_dispatches_all_before_raising():
+    ruleset = mock.Mock()
+    ruleset._api = mock.Mock(unsafe=True)
+    ruleset._api.assertEvent.side_effect = ["[1]", "[2]"]
+    ruleset._process_response.side_effect = [
+        RuleNotFoundError("Rule r1 does not exist"),
+        [],
+    ]
+    rs = AsyncRuleset(ruleset)
+
+    with pytest.raises(RuleNotFoundError):
+        await rs.assert_events(['{"i": 1}', '{"i": 2}'])
+
+    assert ruleset._process_response.call_args_list == [
+        mock.call("[1]"),
+        mock.call("[2]"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_facts():
+    test_data = load_ast("asts/retract_fact.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = await AsyncRuleset.create(
+        ruleset_data["name"], json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("r_0", my_callback))
+
+    await rs.assert_fact(dict(i=67))
+    await rs.assert_fact(dict(j=42))
+    assert not my_callback.called
+
+    await rs.retract_fact(dict(i=67))
+    my_callback.assert_called_with(Matches(data={"m": {"i": 67}}))
+    assert len(await rs.get_facts()) == 0
+    await rs.end_session()
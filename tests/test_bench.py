@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+
+from drools.bench import (
+    _percentile,
+    benchmark_bulk_retract,
+    benchmark_loop_latency,
+    benchmark_ruleset,
+    benchmark_scaling,
+    benchmark_session_lookup,
+    benchmark_upsert,
+    generate_equality_ruleset,
+    load_rulesets,
+    main,
+    rule_names,
+    synthetic_events,
+)
+
+
+def ast_path(filename: str) -> str:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    return f"{test_dir}/{filename}"
+
+
+def test_synthetic_events():
+    ruleset_data = load_rulesets(ast_path("asts/rules_with_assignment.yml"))[0]
+    assert synthetic_events(ruleset_data) == [{"i": 67}]
+
+    ruleset_data = load_rulesets(ast_path("asts/test_in_not_in_ast.yml"))[0]
+    assert synthetic_events(ruleset_data)[:2] == [{"i": 1}, {"i": 5}]
+
+    ruleset_data = load_rulesets(
+        ast_path("asts/test_contains_not_contains_ast.yml")
+    )[0]
+    assert synthetic_events(ruleset_data)[0] == {"i": 1, "id_list": [1]}
+
+    ruleset_data = load_rulesets(
+        ast_path("asts/test_delayed_comparison_ast.yml")
+    )[0]
+    assert synthetic_events(ruleset_data)[0] == {"action": {"type": "Delete"}}
+
+
+def test_synthetic_events_for_every_ast():
+    asts = os.listdir(ast_path("asts"))
+    for filename in asts:
+        for ruleset_data in load_rulesets(ast_path(f"asts/{filename}")):
+            assert synthetic_events(ruleset_data)
+
+
+def test_generate_equality_ruleset():
+    ruleset_data = generate_equality_ruleset(20, attribute="host")
+
+    assert rule_names(ruleset_data)[:2] == ["r_0", "r_1"]
+    assert len(ruleset_data["rules"]) == 20
+    condition = ruleset_data["rules"][9]["Rule"]["condition"]
+    assert "ItemInListExpression" in condition["AllCondition"][0]
+    events = synthetic_events(ruleset_data)
+    assert events == [{"host": f"host-{index}"} for index in range(20)]
+
+
+def test_main_needs_rulesets():
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_rule_names():
+    ruleset_data = load_rulesets(ast_path("asts/retract_fact.yml"))[0]
+    assert rule_names(ruleset_data) == ["r_0"]
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert _percentile(values, 50) == 51.0
+    assert _percentile(values, 99) == 100.0
+    assert _percentile([], 99) == 0.0
+
+
+def test_benchmark_ruleset():
+    ruleset_data = load_rulesets(ast_path("asts/rules_with_assignment.yml"))[0]
+    result = benchmark_ruleset(ruleset_data, iterations=20)
+
+    assert result["matches"] == 40
+    assert result["unknown_rules"] == 0
+    assert result["events_per_sec"] > 0
+    assert result["p50_latency"] <= result["p99_latency"]
+
+
+def test_main(tmp_path):
+    output = tmp_path / "bench.json"
+    assert (
+        main(
+            [
+                ast_path("asts/rules_with_and.yml"),
+                "-n",
+                "10",
+                "-o",
+                str(output),
+            ]
+        )
+        == 0
+    )
+
+    report = json.loads(output.read_text())
+    assert report["codec"] == "json"
+    assert report["jvm_heap"]["used"] > 0
+    assert [result["name"] for result in report["results"]] == ["39 And"]
+
+
+def test_benchmark_upsert():
+    result = benchmark_upsert(iterations=20, hosts=5)
+
+    assert result["upsert_per_sec"] > 0
+    assert result["retract_assert_per_sec"] > 0
+
+
+def test_benchmark_session_lookup():
+    result = benchmark_session_lookup(iterations=20, sizes=(1, 3))
+
+    assert set(result) == {"1", "3"}
+    assert result["3"]["lookup_time"] > 0
+
+
+def test_benchmark_bulk_retract():
+    result = benchmark_bulk_retract(iterations=10)
+
+    assert result["retract_facts_per_sec"] > 0
+    assert result["retract_matching_facts_bulk_per_sec"] > 0
+
+
+def test_benchmark_loop_latency():
+    result = benchmark_loop_latency(iterations=10)
+
+    assert set(result) == {"sync", "async"}
+    assert result["async"]["p50_lag"] <= result["async"]["max_lag"]
+
+
+def test_benchmark_scaling():
+    result = benchmark_scaling(iterations=10, sizes=(1, 2))
+
+    assert result["2"]["events_per_sec"] > 0
+
+
+def test_main_scenarios_need_known_names():
+    with pytest.raises(SystemExit):
+        main(["--scenario", "unknown"])
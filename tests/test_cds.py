@@ -0,0 +1,41 @@
+import json
+import os
+
+import yaml
+
+from drools.cds import create_cds_archive
+from drools.ruleset import _cds_options
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+def test_cds_options(monkeypatch, tmp_path):
+    archive = tmp_path / "drools.jsa"
+    monkeypatch.delenv("DROOLS_JPY_JVM_CDS_DUMP", raising=False)
+    monkeypatch.setenv("DROOLS_JPY_JVM_CDS_ARCHIVE", str(archive))
+    assert _cds_options() == []
+
+    archive.write_bytes(b"")
+    assert _cds_options() == [f"-XX:SharedArchiveFile={archive}"]
+
+    monkeypatch.setenv("DROOLS_JPY_JVM_CDS_DUMP", str(archive))
+    assert _cds_options() == [f"-XX:ArchiveClassesAtExit={archive}"]
+
+
+def test_create_cds_archive(tmp_path):
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    archive = tmp_path / "drools.jsa"
+
+    result = create_cds_archive(
+        str(archive),
+        [json.dumps(test_data[0]["RuleSet"])],
+        [json.dumps(dict(i=67)), json.dumps(dict(i=7))],
+    )
+
+    assert result == str(archive)
+    assert archive.stat().st_size > 0
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 from unittest import mock
@@ -5,10 +6,10 @@ from unittest import mock
 import pytest
 import yaml
 
-from drools.dispatch import Dispatch
+from drools.dispatch import Dispatch, FrameReader, handle_async_messages
 from drools.exceptions import RuleNotFoundError, RulesetNotFoundError
 from drools.rule import Rule
-from drools.ruleset import Matches, Ruleset
+from drools.ruleset import JsonCodec, Matches, Ruleset, RulesetCollection
 
 
 def load_ast(filename: str) -> dict:
@@ -45,6 +46,27 @@ def test_missing_session_id():
         dispatch.run()
 
 
+def test_ended_session_id():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", mock.Mock()))
+
+    session_id = rs.start_session()
+    assert RulesetCollection.get_by_session_id(session_id) is rs
+    rs.end_session()
+
+    dispatch = Dispatch(
+        session_id=session_id,
+        serialized_result='{"assignment": {"first": {"i": 67}}}',
+    )
+    with pytest.raises(RulesetNotFoundError):
+        dispatch.run()
+
+
 def test_missing_rule():
     test_data = load_ast("asts/rules_with_assignment.yml")
 
@@ -63,3 +85,91 @@ def test_missing_rule():
     )
     with pytest.raises(RuleNotFoundError):
         dispatch.run()
+
+
+def frame(payload: bytes) -> bytes:
+    return len(payload).to_bytes(4, "big") + payload
+
+
+@pytest.mark.asyncio
+async def test_async_messages_for_ended_session(caplog):
+    reader = asyncio.StreamReader()
+    payload = json.dumps(
+        {"session_id": -1, "result": ['{"assignment": {}}']}
+    ).encode()
+    reader.feed_data(frame(payload) + frame(payload))
+    reader.feed_eof()
+    writer = mock.Mock()
+
+    await handle_async_messages(reader, writer)
+
+    assert caplog.text.count("Dropping async match") == 2
+    writer.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_messages_follow_codec_changes():
+    reader = asyncio.StreamReader()
+    writer = mock.Mock()
+    payload = frame(json.dumps({"session_id": -1, "result": []}).encode())
+    task = asyncio.create_task(handle_async_messages(reader, writer))
+    reader.feed_data(payload)
+    await asyncio.sleep(0)
+
+    loads = mock.Mock(wraps=json.loads)
+    codec = JsonCodec(name="test", dumps=json.dumps, loads=loads)
+    with mock.patch("drools.ruleset._json_codec", codec):
+        reader.feed_data(payload)
+        reader.feed_eof()
+        await task
+
+    assert loads.called
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_multiple_frames_per_read():
+    reader = asyncio.StreamReader()
+    reader.feed_data(frame(b"one") + frame(b"") + frame(b"three"))
+    reader.feed_eof()
+
+    frame_reader = FrameReader(reader)
+    assert await frame_reader.read_frames() == [b"one", b"", b"three"]
+    assert await frame_reader.read_frames() == []
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_split_frames():
+    payload = os.urandom(1024 * 1024)
+    data = frame(b"small") + frame(payload)
+    reader = asyncio.StreamReader()
+
+    async def feed():
+        for start in range(0, len(data), 1000):
+            end = start + 1000
+            reader.feed_data(data[start:end])
+            await asyncio.sleep(0)
+        reader.feed_eof()
+
+    feeder = asyncio.create_task(feed())
+    frame_reader = FrameReader(reader, chunk_size=4096)
+    frames = []
+    while True:
+        result = await frame_reader.read_frames()
+        if not result:
+            break
+        frames.extend(result)
+    await feeder
+
+    assert frames == [b"small", payload]
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_truncated_frame():
+    reader = asyncio.StreamReader()
+    reader.feed_data(frame(b"complete") + frame(b"truncated")[:-2])
+    reader.feed_eof()
+
+    frame_reader = FrameReader(reader)
+    assert await frame_reader.read_frames() == [b"complete"]
+    with pytest.raises(asyncio.IncompleteReadError):
+        await frame_reader.read_frames()
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+from unittest import mock
+
+import pytest
+import yaml
+
+from drools.exceptions import QueueFullError
+from drools.ingestion import IngestionQueue
+from drools.rule import Rule
+from drools.ruleset import Matches, Ruleset
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+class BlockingHandler:
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.events = []
+
+    def __call__(self, ruleset_name, serialized_event):
+        self.started.set()
+        self.release.wait()
+        self.events.append(json.loads(serialized_event)["i"])
+
+
+def fill(queue, handler, count):
+    # The first event is taken by the worker and blocks in the handler
+    queue.put(dict(i=0))
+    handler.started.wait()
+    for i in range(1, count + 1):
+        queue.put(dict(i=i))
+
+
+def test_reject_policy():
+    handler = BlockingHandler()
+    queue = IngestionQueue("fred", maxsize=2, policy="reject", handler=handler)
+    fill(queue, handler, 2)
+    with pytest.raises(QueueFullError):
+        queue.put(dict(i=3))
+
+    handler.release.set()
+    queue.close()
+    assert handler.events == [0, 1, 2]
+    stats = queue.stats()
+    assert stats["rejected"] == 1
+    assert stats["processed"] == 3
+    assert stats["max_depth"] == 2
+
+
+def test_drop_oldest_policy():
+    handler = BlockingHandler()
+    queue = IngestionQueue(
+        "fred", maxsize=2, policy="drop-oldest", handler=handler
+    )
+    fill(queue, handler, 4)
+
+    handler.release.set()
+    assert queue.join(timeout=5)
+    queue.close()
+    assert handler.events == [0, 3, 4]
+    assert queue.stats()["dropped"] == 2
+
+
+def test_block_policy():
+    handler = BlockingHandler()
+    queue = IngestionQueue("fred", maxsize=1, policy="block", handler=handler)
+    fill(queue, handler, 1)
+    with pytest.raises(QueueFullError):
+        queue.put(dict(i=2), timeout=0.01)
+
+    threading.Timer(0.05, handler.release.set).start()
+    queue.put(dict(i=3), timeout=5)
+    queue.close()
+    assert handler.events == [0, 1, 3]
+    assert queue.depth() == 0
+    with pytest.raises(RuntimeError):
+        queue.put(dict(i=4))
+
+
+def test_failed_events():
+    handler = mock.Mock(side_effect=[ValueError("boom"), None])
+    queue = IngestionQueue("fred", handler=handler)
+    queue.put(dict(i=1))
+    queue.put(dict(i=2))
+    queue.close()
+    stats = queue.stats()
+    assert stats["failed"] == 1
+    assert stats["processed"] == 2
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        IngestionQueue("fred", policy="maybe")
+
+
+def test_ingestion_into_ruleset():
+    test_data = load_ast("asts/rules_with_and.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("r1", my_callback))
+
+    queue = IngestionQueue(ruleset_data["name"], maxsize=4)
+    for i in range(1, 10):
+        queue.put(dict(i=i))
+    queue.close()
+    rs.end_session()
+
+    assert my_callback.call_args_list == [
+        mock.call(Matches(data={"m": {"i": i}})) for i in range(4, 10)
+    ]
+    assert queue.stats()["processed"] == 9
@@ -0,0 +1,72 @@
+import json
+import os
+from unittest import mock
+
+import yaml
+
+from drools.metrics import PrometheusMetrics
+from drools.rule import Rule
+from drools.ruleset import Ruleset, get_metrics_sink, set_metrics_sink
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+def test_prometheus_export():
+    metrics = PrometheusMetrics(buckets=(0.01, 0.1))
+    metrics.record_call("rs", "assertEvent", 0.005, 10, 2)
+    metrics.record_call("rs", "assertEvent", 0.05, 10, 30)
+    metrics.record_call("rs", "assertEvent", 1.0, 10, 0)
+    metrics.record_match("rs", 'say "hi"')
+
+    assert metrics.calls()[("rs", "assertEvent")]["count"] == 3
+    assert metrics.matches() == {("rs", 'say "hi"'): 1}
+    lines = metrics.export().splitlines()
+    labels = 'ruleset="rs",method="assertEvent"'
+    assert "# TYPE drools_jpy_call_duration_seconds histogram" in lines
+    assert (
+        f'drools_jpy_call_duration_seconds_bucket{{{labels},le="0.01"}} 1'
+        in lines
+    )
+    assert (
+        f'drools_jpy_call_duration_seconds_bucket{{{labels},le="0.1"}} 2'
+        in lines
+    )
+    assert (
+        f'drools_jpy_call_duration_seconds_bucket{{{labels},le="+Inf"}} 3'
+        in lines
+    )
+    assert f"drools_jpy_call_duration_seconds_count{{{labels}}} 3" in lines
+    assert f"drools_jpy_call_request_chars_total{{{labels}}} 30" in lines
+    assert f"drools_jpy_call_response_chars_total{{{labels}}} 32" in lines
+    assert 'drools_jpy_matches_total{ruleset="rs",rule="say \\"hi\\""} 1' in (
+        lines
+    )
+
+
+def test_metrics_sink():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    metrics = PrometheusMetrics()
+    set_metrics_sink(metrics)
+    try:
+        assert get_metrics_sink() is metrics
+        ruleset_data = test_data[0]["RuleSet"]
+        rs = Ruleset(
+            name=ruleset_data["name"],
+            serialized_ruleset=json.dumps(ruleset_data),
+        )
+        rs.add_rule(Rule("assignment", mock.Mock()))
+        rs.assert_event(json.dumps(dict(i=67)))
+        rs.assert_event(json.dumps(dict(i=7)))
+        rs.end_session()
+    finally:
+        set_metrics_sink(None)
+
+    calls = metrics.calls()
+    assert calls[("", "createRuleset")]["count"] == 1
+    assert calls[(ruleset_data["name"], "assertEvent")]["count"] == 2
+    assert metrics.matches() == {(ruleset_data["name"], "assignment"): 1}
@@ -0,0 +1,151 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+import yaml
+
+from drools.profiler import RuleProfiler, analyze
+from drools.rule import Rule
+from drools.ruleset import Ruleset, SessionStats
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+def test_analyze_features():
+    features = {}
+    for filename in (
+        "asts/test_selectattr_1_ast.yml",
+        "asts/test_compare_with_saved_event_ast.yml",
+        "asts/test_accumulate_within_ast.yml",
+        "asts/test_in_not_in_ast.yml",
+    ):
+        ruleset_data = load_ast(filename)[0]["RuleSet"]
+        for condition in analyze(ruleset_data):
+            features.setdefault(condition.rule, set()).update(
+                condition.features
+            )
+
+    assert "selectattr" in features["r1"]
+    assert "self-reference" in features["Gala rules"]
+    assert "in" in features["Gala rules"]
+    assert any("accumulate_within" in value for value in features.values())
+
+
+def test_analyze_assignment_has_no_features():
+    ruleset_data = load_ast("asts/rules_with_assignment.yml")[0]["RuleSet"]
+    (condition,) = analyze(ruleset_data)
+
+    assert condition.expression == "EqualsExpression"
+    assert condition.paths == ("i",)
+    assert condition.features == ()
+    assert condition.cost == 1
+
+
+def _rule(name, expression):
+    return {
+        "Rule": {
+            "name": name,
+            "condition": {"AllCondition": [expression]},
+            "enabled": True,
+        }
+    }
+
+
+def test_profiler_ranks_by_estimated_work():
+    ruleset_data = {
+        "name": "profiled",
+        "rules": [
+            _rule(
+                "plain",
+                {
+                    "EqualsExpression": {
+                        "lhs": {"Event": "host"},
+                        "rhs": {"String": "a"},
+                    }
+                },
+            ),
+            _rule(
+                "member",
+                {
+                    "ItemInListExpression": {
+                        "lhs": {"Event": "host"},
+                        "rhs": [{"String": "a"}, {"String": "b"}],
+                    }
+                },
+            ),
+            _rule(
+                "select",
+                {
+                    "SelectAttrExpression": {
+                        "lhs": {"Event": "people"},
+                        "rhs": {
+                            "key": {"String": "age"},
+                            "operator": {"String": ">"},
+                            "value": {"Integer": 30},
+                        },
+                    }
+                },
+            ),
+        ],
+    }
+    profiler = RuleProfiler(ruleset_data)
+    for _ in range(3):
+        profiler.record(
+            json.dumps({"host": "a"}), 0.5, json.dumps([{"plain": {}}])
+        )
+    profiler.record(json.dumps({"people": []}), 0.25, None)
+    report = profiler.report(SessionStats(session_id=1, ruleset_name="rs"))
+
+    assert report.calls == 4
+    assert report.total_time == pytest.approx(1.75)
+    assert [condition.rule for condition in report.conditions] == [
+        "member",
+        "select",
+        "plain",
+    ]
+    assert [condition.estimated_work for condition in report.conditions] == [
+        9,
+        5,
+        3,
+    ]
+    assert report.keys[0].key == "host"
+    assert report.keys[0].calls == 3
+    assert report.keys[0].time == pytest.approx(1.5)
+    rules = {rule.name: rule for rule in report.rules}
+    assert rules["plain"].activations == 3
+    assert "not measured per node" in report.format()
+    assert "can't be told apart" in report.format()
+    assert report.as_dict()["conditions"][0]["estimated_work"] == 9
+
+
+def test_profile_report():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"],
+        serialized_ruleset=json.dumps(ruleset_data),
+        profiling=True,
+    )
+    rs.add_rule(Rule("assignment", my_callback))
+
+    rs.assert_event(json.dumps(dict(i=67)))
+    rs.assert_event(json.dumps(dict(j=67)))
+    rs.disable_profiling()
+    rs.assert_event(json.dumps(dict(i=67)))
+    report = rs.profile_report()
+    rs.end_session()
+
+    assert report.calls == 2
+    assert report.conditions[0].rule == "assignment"
+    assert report.conditions[0].evaluations == 1
+    assert report.rules[0].activations == 1
+    assert {key.key for key in report.keys} == {"i", "j"}
+    assert report.session.rules["assignment"].fire_count == 2
@@ -1,6 +1,8 @@
 import asyncio
+import dataclasses
 import json
 import os
+import threading
 from unittest import mock
 
 import pytest
@@ -10,16 +12,33 @@ import drools
 from drools.dispatch import establish_async_channel, handle_async_messages
 from drools.rule import Rule
 from drools.ruleset import (
+    GarbageCollector,
+    LazyMatches,
     Matches,
+    RuleDispatcher,
     Ruleset,
     RulesetCollection,
+    SessionStats,
     assert_event,
+    assert_events,
     assert_fact,
+    configure_jvm,
+    count_facts,
     end_session,
+    gc_stats,
     get_facts,
+    get_json_codec,
     get_pending_events,
+    get_session_stats,
+    iter_fact_pages,
+    iter_facts,
+    jvm_tuning_options,
     post,
     retract_fact,
+    retract_facts,
+    retract_matching_facts_bulk,
+    set_json_codec,
+    upsert_fact,
 )
 
 
@@ -264,6 +283,120 @@ def test_and_single_result():
     my_callback.assert_called_with(result)
 
 
+def test_assert_events():
+    test_data = load_ast("asts/rules_with_and.yml")
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+
+    for rule_data in ruleset_data["rules"]:
+        rule_name = rule_data["Rule"]["name"]
+        my_callback = mock.Mock()
+        rs.add_rule(Rule(rule_name, my_callback))
+
+    rs.assert_events([json.dumps(dict(i=i)) for i in (1, 2, 3)])
+    assert not my_callback.called
+    assert_events(ruleset_data["name"], [dict(i=4), dict(i=67)])
+    rs.end_session()
+    assert my_callback.call_args_list == [
+        mock.call(Matches(data={"m": {"i": 4}})),
+        mock.call(Matches(data={"m": {"i": 67}})),
+    ]
+
+
+def test_assert_event_bytes():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", my_callback))
+
+    assert_event(ruleset_data["name"], json.dumps(dict(i=67)).encode())
+    rs.end_session()
+    my_callback.assert_called_with(Matches(data={"first": {"i": 67}}))
+
+
+def test_lazy_matches():
+    matches = LazyMatches('{"m": {"i": 67}, "n": [1, "}"]}', "abc")
+    assert not hasattr(matches, "__dict__")
+    assert matches.data["m"] == {"i": 67}
+    assert list(matches.data._values) == ["m"]
+    assert len(matches.data) == 2
+    assert matches.data == {"m": {"i": 67}, "n": [1, "}"]}
+    assert matches == Matches(
+        data={"m": {"i": 67}, "n": [1, "}"]}, matching_uuid="abc"
+    )
+    assert Matches(data={"m": {"i": 67}, "n": [1, "}"]}) != matches
+    assert LazyMatches('{"m": 1}') == LazyMatches({"m": 1})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        matches.data = {}
+    with pytest.raises(TypeError):
+        hash(matches)
+
+
+def test_lazy_matches_dispatch():
+    class Dispatcher(RuleDispatcher):
+        name = "lazy"
+        lazy_matches = True
+        _session_id = 1
+
+        def __init__(self):
+            self._rules = {}
+            self._rule_stats = {}
+
+    my_callback1 = mock.Mock()
+    my_callback2 = mock.Mock()
+    dispatcher = Dispatcher()
+    dispatcher.add_rule(Rule("r1", my_callback1))
+    dispatcher.add_rule(Rule("r2", my_callback2))
+
+    dispatcher._process_response(
+        '[{"name": "r1", "events": {"m": {"i": 1}}, "matching_uuid": "u"},'
+        ' {"r2": {"m": "]"}}]'
+    )
+    dispatcher.dispatch('{"r2": {"m": 2}}')
+
+    my_callback1.assert_called_once_with(
+        Matches(data={"m": {"i": 1}}, matching_uuid="u")
+    )
+    assert my_callback2.call_args_list == [
+        mock.call(Matches(data={"m": "]"})),
+        mock.call(Matches(data={"m": 2})),
+    ]
+    assert isinstance(my_callback1.call_args[0][0], LazyMatches)
+
+
+@pytest.mark.parametrize(
+    "payload", ["[", "[1 2]", '{"a" 1}', '{"a": "b}', "x"]
+)
+def test_json_members_invalid(payload):
+    with pytest.raises(ValueError):
+        list(drools.ruleset._json_members(payload))
+
+
+def test_assert_event_lazy_matches():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"],
+        serialized_ruleset=json.dumps(ruleset_data),
+        lazy_matches=True,
+    )
+    rs.add_rule(Rule("assignment", my_callback))
+
+    rs.assert_event(json.dumps(dict(i=67)))
+    rs.end_session()
+    my_callback.assert_called_with(Matches(data={"first": {"i": 67}}))
+    assert isinstance(my_callback.call_args[0][0], LazyMatches)
+
+
 def test_retract_fact():
     test_data = load_ast("asts/retract_fact.yml")
 
@@ -342,6 +475,122 @@ def test_retract_matching_facts_complete():
     assert len(response) == 0
 
 
+def test_retract_facts():
+    test_data = load_ast("asts/retract_fact.yml")
+
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("r_0", my_callback))
+
+    rs.assert_fact(json.dumps(dict(i=67)))
+    rs.assert_fact(json.dumps(dict(i=68)))
+    rs.assert_fact(json.dumps(dict(j=42)))
+    assert not my_callback.called
+
+    results = retract_facts(ruleset_data["name"], [dict(i=67), dict(i=68)])
+
+    assert results == [{"r_0": {"m": {"i": 67}}}, {"r_0": {"m": {"i": 68}}}]
+
+    assert my_callback.call_args_list == [
+        mock.call(Matches(data={"m": {"i": 67}})),
+        mock.call(Matches(data={"m": {"i": 68}})),
+    ]
+    response = rs.get_facts()
+    rs.end_session()
+    assert len(response) == 0
+
+
+def test_retract_matching_facts_bulk():
+    test_data = load_ast("asts/retract_matching_facts.yml")
+
+    my_callback1 = mock.Mock()
+    my_callback2 = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("r1", my_callback1))
+    rs.add_rule(Rule("r2", my_callback2))
+
+    rs.assert_fact(json.dumps(dict(i=67, n=239)))
+    rs.assert_fact(json.dumps(dict(i=67, n=240)))
+    assert not my_callback1.called
+
+    results = retract_matching_facts_bulk(
+        ruleset_data["name"], [dict(n=239), dict(n=240)], True, []
+    )
+
+    assert [list(result) for result in results] == [["r2"], ["r2"]]
+
+    assert my_callback2.call_args_list == [
+        mock.call(Matches(data={"m": {"i": 67, "n": 239}})),
+        mock.call(Matches(data={"m": {"i": 67, "n": 240}})),
+    ]
+    response = rs.get_facts()
+    rs.end_session()
+    assert len(response) == 0
+
+
+def test_upsert_fact():
+    test_data = load_ast("asts/multiple_hosts.yml")
+
+    my_callback1 = mock.Mock()
+    my_callback2 = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("Host 1 rule", my_callback1))
+    rs.add_rule(Rule("Host 2 rule", my_callback2))
+
+    rs.upsert_fact(["host"], json.dumps(dict(host="A", os="linux")))
+    rs.upsert_fact(["host"], dict(host="B", os="linux", meta=dict(uuid="1")))
+    rs.assert_fact(json.dumps(dict(host="A", owner="ops")))
+    rs.assert_fact(json.dumps(dict(host="A", os="linux", since=1)))
+    upsert_fact(
+        ruleset_data["name"], ["host"], b'{"host": "A", "os": "windows"}'
+    )
+    rs.upsert_fact(["host"], dict(host="B", os="bsd", since=2))
+
+    facts = [
+        {key: value for key, value in fact.items() if key != "meta"}
+        for fact in rs.get_facts()
+    ]
+    assert sorted(facts, key=lambda fact: sorted(fact.items())) == [
+        dict(host="A", os="linux", since=1),
+        dict(host="A", os="windows"),
+        dict(host="A", owner="ops"),
+        dict(host="B", os="bsd", since=2),
+    ]
+
+    rs.assert_event(json.dumps(dict(i=1)))
+    rs.end_session()
+    my_callback1.assert_called_once_with(
+        Matches(data={"m_0": {"host": "A", "os": "windows"}, "m_1": {"i": 1}})
+    )
+    assert not my_callback2.called
+
+
+@pytest.mark.parametrize(
+    "key_fields,fact", [([], dict(host="A")), (["id"], dict(host="A"))]
+)
+def test_upsert_fact_invalid_keys(key_fields, fact):
+    test_data = load_ast("asts/multiple_hosts.yml")
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    with pytest.raises(ValueError):
+        rs.upsert_fact(key_fields, fact)
+    rs.end_session()
+
+
 def test_get_facts():
     test_data = load_ast("asts/assert_fact.yml")
 
@@ -360,6 +609,69 @@ def test_get_facts():
     assert len(response) == 0
 
 
+def test_iter_facts():
+    test_data = load_ast("asts/multiple_hosts.yml")
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("Host 1 rule", mock.Mock()))
+    rs.add_rule(Rule("Host 2 rule", mock.Mock()))
+
+    for i in range(5):
+        rs.assert_fact(json.dumps(dict(host=f"h{i}", os="linux", index=i)))
+
+    facts = rs.get_facts()
+    assert list(iter_facts(ruleset_data["name"])) == facts
+    assert count_facts(ruleset_data["name"]) == len(facts)
+    assert count_facts(
+        ruleset_data["name"], lambda fact: fact.get("index", 0) > 2
+    ) == len([fact for fact in facts if fact.get("index", 0) > 2])
+    pages = list(iter_fact_pages(ruleset_data["name"], 2))
+    assert [fact for page in pages for fact in page] == facts
+    assert all(len(page) <= 2 for page in pages)
+    rs.end_session()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    ["[]", " [ ] ", '[{"a": 1}]', '[ {"a": [1, 2]} ,\n {"b": "]"} ]'],
+)
+def test_iter_json_array(payload):
+    assert list(drools.ruleset._iter_json_array(payload)) == json.loads(
+        payload
+    )
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        "[]",
+        " [ ] ",
+        '[{"a": 1}]',
+        '[ {"a": [1, 2]} ,\n {"b": "],[\\"{"} ]',
+        '[1, "a", null]',
+    ],
+)
+def test_count_json_array(payload):
+    assert drools.ruleset._count_json_array(payload) == len(
+        json.loads(payload)
+    )
+
+
+@pytest.mark.parametrize("payload", ["{}", "[1,", '[{"a": "]"}'])
+def test_count_json_array_invalid(payload):
+    with pytest.raises(ValueError):
+        drools.ruleset._count_json_array(payload)
+
+
+@pytest.mark.parametrize("payload", ["{}", '[{"a": 1} {"b": 2}]', "[1,"])
+def test_iter_json_array_invalid(payload):
+    with pytest.raises(ValueError):
+        list(drools.ruleset._iter_json_array(payload))
+
+
 def test_assert_event_no_matching_rules():
     test_data = load_ast("asts/rules_with_assignment.yml")
     my_callback = mock.Mock()
@@ -1063,6 +1375,55 @@ def test_session_stats():
     my_callback.assert_called_with(result)
 
 
+def test_get_session_stats():
+    test_data = load_ast("asts/test_stats.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", my_callback))
+
+    rs.assert_event(json.dumps(dict(i=67)))
+    rs.assert_event(json.dumps(dict(j=67)))
+    rs.assert_fact(json.dumps(dict(host="A", os="linux")))
+    stats = get_session_stats(ruleset_data["name"], include_facts=True)
+
+    assert stats.session_id == rs._session_id
+    assert stats.ruleset_name == ruleset_data["name"]
+    assert stats.rules_triggered == 1
+    assert stats.number_of_rules == 1
+    assert stats.number_of_disabled_rules == 1
+    assert stats.events_processed == 2
+    assert stats.events_matched == 1
+    assert stats.engine["eventsProcessed"] == 2
+    assert stats.rules["assignment"].fire_count == 1
+    assert stats.rules["assignment"].max_time >= 0
+    assert stats.top_rules(1)[0].name == "assignment"
+    assert sum(fact.count for fact in stats.facts.values()) == len(
+        rs.get_facts()
+    )
+    assert stats.partial_events is None
+
+    rs.end_session()
+
+
+def test_session_stats_from_engine():
+    stats = SessionStats.from_engine(
+        1,
+        "rs",
+        {"rulesTriggered": 3, "eventsProcessed": 7, "peakMemory": None},
+        {},
+    )
+
+    assert stats.rules_triggered == 3
+    assert stats.events_processed == 7
+    assert stats.peak_memory == 0
+    assert stats.events_matched == 0
+    assert stats.facts is None
+
+
 @pytest.mark.parametrize(
     ("number_of_events", "rules_triggered", "events_matched"),
     [(2, 0, 0), (5, 1, 1), (3, 1, 1)],
@@ -1092,3 +1453,184 @@ def test_accumulate_within(number_of_events, rules_triggered, events_matched):
     assert stats["eventsProcessed"] == number_of_events
     assert stats["eventsMatched"] == events_matched
     rs.end_session()
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgspec", "ujson"])
+def test_json_codecs(codec):
+    if codec != "json":
+        pytest.importorskip(codec)
+    test_data = load_ast("asts/test_squaredaccessor_ast.yml")
+
+    previous = get_json_codec()
+    try:
+        selected = set_json_codec(codec)
+        assert selected.name == codec
+        assert get_json_codec() is selected
+        assert selected.loads(selected.dumps(test_data)) == test_data
+        assert selected.loads(selected.dumps(test_data).encode()) == test_data
+        assert selected.loads(selected.dumps({1: "a", "b": 2})) == {
+            "1": "a",
+            "b": 2,
+        }
+        assert json.loads(selected.dumps({"n": 2**70})) == {"n": 2**70}
+    finally:
+        set_json_codec(previous.name)
+
+
+def test_unknown_json_codec():
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        set_json_codec("yaml")
+
+
+def test_jvm_tuning_options():
+    assert jvm_tuning_options() == []
+    assert jvm_tuning_options(
+        preset="low-latency",
+        initial_heap="256M",
+        max_metaspace="128m",
+        string_deduplication=True,
+        options=["-XX:+AlwaysPreTouch"],
+    ) == [
+        "-XX:+UseZGC",
+        "-Xms256M",
+        "-XX:MaxMetaspaceSize=128m",
+        "-XX:+UseStringDeduplication",
+        "-XX:+AlwaysPreTouch",
+    ]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(preset="fastest"),
+        dict(initial_heap="lots"),
+        dict(max_metaspace="-1"),
+        dict(options=["UseZGC"]),
+        dict(preset="high-throughput", options=["-XX:+UseZGC"]),
+        dict(alpha_hashing_threshold=-1),
+        dict(alpha_hashing_threshold="3"),
+    ],
+)
+def test_invalid_jvm_tuning_options(kwargs):
+    with pytest.raises(ValueError):
+        jvm_tuning_options(**kwargs)
+
+
+def test_alpha_hashing_threshold(monkeypatch):
+    assert jvm_tuning_options(alpha_hashing_threshold=1) == [
+        "-Ddrools.alphaNodeHashingThreshold=1"
+    ]
+    monkeypatch.setenv("DROOLS_JPY_ALPHA_HASHING_THRESHOLD", "2")
+    assert drools.ruleset._tuning_options() == [
+        "-Ddrools.alphaNodeHashingThreshold=2"
+    ]
+    monkeypatch.setenv("DROOLS_JPY_ALPHA_HASHING_THRESHOLD", "many")
+    with pytest.raises(ValueError):
+        drools.ruleset._tuning_options()
+
+
+def test_jvm_tuning_environment(monkeypatch):
+    monkeypatch.setenv("DROOLS_JPY_JVM_PRESET", "high-throughput")
+    monkeypatch.setenv("DROOLS_JPY_JVM_OPTS", "-Xss2m  -XX:+AlwaysPreTouch")
+    assert drools.ruleset._tuning_options() == [
+        "-XX:+UseParallelGC",
+        "-Xss2m",
+        "-XX:+AlwaysPreTouch",
+    ]
+
+
+def test_configure_jvm_after_start():
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    with pytest.raises(RuntimeError, match="already running"):
+        configure_jvm(preset="low-latency")
+    rs.end_session()
+
+
+@pytest.mark.parametrize(
+    "policy,threshold,collections,skipped",
+    [
+        ("count", 0.0, 4, 0),
+        ("heap", 0.0, 4, 0),
+        ("heap", 1.1, 0, 4),
+        ("off", 0.0, 0, 0),
+    ],
+)
+def test_gc_policies(monkeypatch, policy, threshold, collections, skipped):
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", mock.Mock()))
+
+    monkeypatch.setattr(
+        drools.ruleset,
+        "garbage_collector",
+        GarbageCollector(policy=policy, gc_after=2, heap_threshold=threshold),
+    )
+    for i in range(8):
+        post(ruleset_data["name"], dict(i=i))
+    rs.end_session()
+
+    stats = gc_stats()
+    assert stats["policy"] == policy
+    assert stats["collections"] == collections
+    assert stats["skipped"] == skipped
+
+
+def test_gc_time_policy(monkeypatch):
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+
+    monkeypatch.setattr(
+        drools.ruleset,
+        "garbage_collector",
+        GarbageCollector(policy="time", interval=0),
+    )
+    post(ruleset_data["name"], dict(i=1))
+    post(ruleset_data["name"], dict(i=2))
+    rs.end_session()
+
+    stats = gc_stats()
+    assert stats["collections"] == 2
+    assert stats["max_time"] >= 0
+
+
+def test_gc_concurrent_posts(monkeypatch):
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", mock.Mock()))
+
+    monkeypatch.setattr(
+        drools.ruleset,
+        "garbage_collector",
+        GarbageCollector(policy="count", gc_after=50),
+    )
+
+    def worker():
+        for i in range(100):
+            post(ruleset_data["name"], dict(i=i))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    rs.end_session()
+
+    assert gc_stats()["collections"] == 8
+
+
+def test_invalid_gc_policy():
+    with pytest.raises(ValueError, match="Invalid GC policy"):
+        GarbageCollector(policy="sometimes")
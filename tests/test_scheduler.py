@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+from unittest import mock
+
+import pytest
+import yaml
+
+from drools.rule import Rule
+from drools.ruleset import Matches, Ruleset
+from drools.scheduler import SessionScheduler
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+def test_assignment():
+    scheduler = SessionScheduler(workers=2)
+    assert scheduler.worker_for("a") == 0
+    assert scheduler.worker_for("b") == 1
+    assert scheduler.worker_for("c") == 0
+    assert scheduler.worker_for("a") == 0
+    assert scheduler.stats()["rulesets"] == [2, 1]
+
+    scheduler.release("a")
+    scheduler.release("c")
+    assert scheduler.worker_for("d") == 0
+    scheduler.shutdown()
+
+
+def test_invalid_workers():
+    with pytest.raises(ValueError):
+        SessionScheduler(workers=0)
+
+
+def test_ordering_and_parallelism():
+    scheduler = SessionScheduler(workers=2)
+    calls = {"a": [], "b": []}
+    threads = {"a": set(), "b": set()}
+
+    def record(name, value):
+        time.sleep(0.001)
+        calls[name].append(value)
+        threads[name].add(threading.get_ident())
+
+    futures = []
+    for i in range(50):
+        futures.append(scheduler.submit("a", record, "a", i))
+        futures.append(scheduler.submit("b", record, "b", i))
+    for future in futures:
+        future.result()
+
+    assert calls == {"a": list(range(50)), "b": list(range(50))}
+    assert len(threads["a"]) == 1
+    assert threads["a"] != threads["b"]
+
+    scheduler.shutdown()
+    stats = scheduler.stats()
+    assert stats["queued"] == [0, 0]
+    assert stats["completed"] == [50, 50]
+
+
+def test_scheduled_rulesets():
+    test_data = load_ast("asts/rules_with_and.yml")
+    scheduler = SessionScheduler(workers=2)
+
+    callbacks = []
+    for index in range(2):
+        ruleset_data = dict(test_data[0]["RuleSet"], name=f"r{index}")
+        rs = Ruleset(
+            name=ruleset_data["name"],
+            serialized_ruleset=json.dumps(ruleset_data),
+        )
+        my_callback = mock.Mock()
+        rs.add_rule(Rule("r1", my_callback))
+        callbacks.append(my_callback)
+
+    futures = []
+    for i in range(4, 14):
+        futures.append(scheduler.post("r0", dict(i=i)))
+        futures.append(scheduler.assert_event("r1", dict(i=i)))
+    futures.append(scheduler.end_session("r0"))
+    futures.append(scheduler.end_session("r1"))
+    for future in futures:
+        future.result()
+    scheduler.shutdown()
+
+    for my_callback in callbacks:
+        assert my_callback.call_args_list == [
+            mock.call(Matches(data={"m": {"i": i}})) for i in range(4, 14)
+        ]
+    assert scheduler.stats()["rulesets"] == [0, 0]
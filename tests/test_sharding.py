@@ -0,0 +1,101 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+import yaml
+
+from drools.exceptions import RulesetNotFoundError, ShardFailedError
+from drools.rule import Rule
+from drools.ruleset import Matches
+from drools.sharding import ShardedEngine
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+def test_invalid_shards():
+    with pytest.raises(ValueError):
+        ShardedEngine(shards=0)
+
+
+def test_dead_shard_fails_pending_calls():
+    engine = ShardedEngine(shards=1)
+    try:
+        shard = engine._shards[0]
+        shard.process.kill()
+        shard.process.join()
+        future = engine._call(shard, "create", "r0", "{}")
+        with pytest.raises(ShardFailedError):
+            future.result(timeout=10)
+        with pytest.raises(ShardFailedError):
+            engine._call(shard, "create", "r1", "{}").result(timeout=10)
+    finally:
+        engine.shutdown(timeout=5)
+
+
+def test_late_result_keeps_receiver_running():
+    engine = ShardedEngine(shards=1)
+    try:
+        shard = engine._shards[0]
+        shard.responses.put(("result", -1, None, None))
+        shard.responses.put(("match", "missing", "{}"))
+        # Answered by the receiver, with an error for the missing ruleset
+        future = engine._call(shard, "get_facts", "missing")
+        assert future.exception(timeout=10) is not None
+        assert engine._receivers[0].is_alive()
+    finally:
+        engine.shutdown(timeout=5)
+
+
+def test_sharded_rulesets():
+    test_data = load_ast("asts/rules_with_and.yml")
+    engine = ShardedEngine(shards=2)
+    try:
+        callbacks = []
+        for index in range(4):
+            ruleset_data = dict(test_data[0]["RuleSet"], name=f"r{index}")
+            rs = engine.create_ruleset(
+                ruleset_data["name"], json.dumps(ruleset_data)
+            )
+            assert rs.shard == index % 2
+            my_callback = mock.Mock()
+            rs.add_rule(Rule("r1", my_callback))
+            callbacks.append(my_callback)
+        with pytest.raises(ValueError):
+            engine.create_ruleset("r0", json.dumps(ruleset_data))
+        assert engine.get("r0").shard == 0
+
+        futures = []
+        for i in range(1, 10):
+            for index in range(4):
+                futures.append(engine.post(f"r{index}", dict(i=i)))
+        for future in futures:
+            future.result()
+
+        for my_callback in callbacks:
+            assert my_callback.call_args_list == [
+                mock.call(Matches(data={"m": {"i": i}})) for i in range(4, 10)
+            ]
+
+        assert isinstance(engine.get_facts("r0").result(), list)
+        engine.end_session("r0").result()
+        with pytest.raises(RulesetNotFoundError):
+            engine.post("missing", dict(i=1))
+    finally:
+        engine.shutdown()
+
+
+def test_sharded_ruleset_errors():
+    engine = ShardedEngine(shards=1)
+    try:
+        with pytest.raises(RuntimeError, match="gobbledygook"):
+            engine.create_ruleset("fred", "gobbledygook=xyz")
+        with pytest.raises(RulesetNotFoundError):
+            engine.get("fred")
+    finally:
+        engine.shutdown()
@@ -0,0 +1,92 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+import yaml
+
+from drools import tracing
+from drools.dispatch import Dispatch
+from drools.rule import Rule
+from drools.ruleset import Ruleset
+
+
+def load_ast(filename: str) -> dict:
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{test_dir}/{filename}") as f:
+        test_data = yaml.safe_load(f)
+    return test_data
+
+
+@pytest.fixture
+def spans():
+    sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+    export = pytest.importorskip("opentelemetry.sdk.trace.export")
+    in_memory = pytest.importorskip(
+        "opentelemetry.sdk.trace.export.in_memory_span_exporter"
+    )
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    tracing.enable_tracing(provider)
+    yield exporter
+    tracing.disable_tracing()
+
+
+def test_assert_event_spans(spans):
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", my_callback))
+    spans.clear()
+
+    rs.assert_event(json.dumps(dict(i=67)))
+    rs.end_session()
+
+    finished = {span.name: span for span in spans.get_finished_spans()}
+    parent = finished["drools.assert_event"]
+    evaluate = finished["drools.engine.assertEvent"]
+    callback = finished["drools.callback"]
+    assert evaluate.parent.span_id == parent.context.span_id
+    assert callback.parent.span_id == parent.context.span_id
+    assert callback.attributes["drools.rule"] == "assignment"
+    assert parent.attributes["drools.ruleset"] == ruleset_data["name"]
+
+
+def test_async_dispatch_linked_to_assert(spans):
+    test_data = load_ast("asts/rules_with_assignment.yml")
+    my_callback = mock.Mock()
+
+    ruleset_data = test_data[0]["RuleSet"]
+    rs = Ruleset(
+        name=ruleset_data["name"], serialized_ruleset=json.dumps(ruleset_data)
+    )
+    rs.add_rule(Rule("assignment", my_callback))
+    rs.assert_event(json.dumps(dict(i=7)))
+
+    Dispatch(
+        session_id=rs._session_id,
+        serialized_result=json.dumps({"assignment": {"first": {"i": 7}}}),
+    ).run()
+    rs.end_session()
+
+    finished = {span.name: span for span in spans.get_finished_spans()}
+    assert_span = finished["drools.assert_event"]
+    dispatch_span = finished["drools.async_dispatch"]
+    assert dispatch_span.links[0].context.span_id == (
+        assert_span.context.span_id
+    )
+    callback = finished["drools.callback"]
+    assert callback.parent.span_id == dispatch_span.context.span_id
+
+
+def test_tracing_disabled():
+    assert tracing.get_tracer() is None
+    func = mock.Mock()
+    assert tracing.bind_context(func) is func
+    with tracing.operation_span(mock.Mock(), "assert_event") as span:
+        assert span is None